@@ -0,0 +1,440 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from app.handlers import HandlerRegistry
+from app.memo import NodeMemo
+from app.models import Node
+from app.run_context import RunContext
+from app.utils.graph_utils import FLOW_TYPES, MAP, REDUCE, ExecutionPlan, MapRegion
+from app.utils.events import token_sink
+from app.utils.http_clients import HTTPClients
+from app.utils.metrics import NODE_DURATION_SECONDS, NODE_OUTPUT_BYTES, NODE_QUEUE_SECONDS
+from app.utils.node_output import ERROR_PREFIXES, NodeOutput
+
+logger = logging.getLogger(__name__)
+
+# Handlers may return text, a JSON-compatible value or a NodeOutput.
+Handler = Callable[[RunContext], Awaitable[Any]]
+EventCallback = Callable[[str, dict], None]
+
+# Per-type node deadlines in seconds, each overridable with NODE_TIMEOUT_<TYPE> (0 disables).
+DEFAULT_NODE_TIMEOUTS = {
+    "askAI": 300,
+    "linkedIn": 120,
+    "typeform": 60,
+    "pdfGenerator": 120,
+    "combineText": 10,
+    "cultureFit": 10,
+    "recordScores": 10,
+    # A map node's items run under the workflow deadline and their own nodes' deadlines.
+    "map": 0,
+}
+NODE_TIMEOUT_SECONDS = float(os.environ.get("NODE_TIMEOUT_SECONDS", "300"))
+NODE_TIMEOUTS = {
+    node_type: float(os.environ.get(f"NODE_TIMEOUT_{node_type.upper()}", default))
+    for node_type, default in DEFAULT_NODE_TIMEOUTS.items()
+}
+WORKFLOW_TIMEOUT_SECONDS = float(os.environ.get("WORKFLOW_TIMEOUT_SECONDS", "900"))
+
+# Items a map node runs at once unless its data sets concurrency, and the most it accepts.
+MAP_CONCURRENCY = int(os.environ.get("MAP_CONCURRENCY", "4"))
+MAP_MAX_ITEMS = int(os.environ.get("MAP_MAX_ITEMS", "500"))
+
+
+def node_timeout(node: Node) -> Optional[float]:
+    """Deadline for one node: its own ``timeout`` field, else its type's, else the default."""
+    timeout = getattr(node.data, "timeout", None)
+    if timeout is None:
+        timeout = NODE_TIMEOUTS.get(node.type, NODE_TIMEOUT_SECONDS)
+    timeout = float(timeout)
+    return timeout if timeout > 0 else None
+
+
+def workflow_timeout(plan: ExecutionPlan) -> Optional[float]:
+    timeout = plan.timeout if plan.timeout is not None else WORKFLOW_TIMEOUT_SECONDS
+    return timeout if timeout > 0 else None
+
+
+async def run_node(
+    node_id: str,
+    plan: ExecutionPlan,
+    handlers: Dict[str, Handler],
+    clients: HTTPClients,
+    outputs: dict,
+    on_event: Optional[EventCallback] = None,
+    ready_at: Optional[float] = None,
+    timings: Optional[dict] = None,
+    memo: Optional[NodeMemo] = None,
+) -> NodeOutput:
+    """Run a node's handler on a RunContext holding its parents' outputs, recording its timings.
+
+    With ``memo`` the output of an unchanged node is replayed from the node cache instead.
+    """
+    node = plan.nodes[node_id]
+    handler = handlers[node.type]
+    parent_ids = plan.parents[node_id]
+
+    memo_key = memo.key(node, parent_ids, outputs) if memo is not None else None
+    if memo_key is not None:
+        started = time.perf_counter()
+        cached = await memo.get(node_id, memo_key)
+        if cached is not None:
+            duration = time.perf_counter() - started
+            NODE_DURATION_SECONDS.observe(duration, node.type, "cached")
+            if timings is not None:
+                timings[node_id] = {
+                    "type": node.type,
+                    "queue_seconds": started - ready_at if ready_at is not None else 0.0,
+                    "duration_seconds": duration,
+                    "output_bytes": len(cached.text),
+                    "cached": True,
+                }
+            logger.info("node served from cache node_id=%s type=%s", node_id, node.type)
+            return cached
+
+    # askAI takes a cultureFit parent's output as its context rather than as an input.
+    resolved = {}
+    inputs = []
+    for parent_id in parent_ids:
+        if node.type == "askAI" and plan.nodes[parent_id].type == "cultureFit":
+            resolved.setdefault("context", outputs[parent_id].text)
+            continue
+        inputs.append(outputs[parent_id])
+    ctx = RunContext.for_node(node, inputs, clients, **resolved)
+
+    if on_event is not None:
+        on_event("node_start", {"node_id": node_id, "type": node.type})
+        # Each node runs in its own task, so this binding only applies to this handler call.
+        token_sink.set(lambda text: on_event("token", {"node_id": node_id, "text": text}))
+
+    started = time.perf_counter()
+    queue_seconds = started - ready_at if ready_at is not None else 0.0
+    NODE_QUEUE_SECONDS.observe(queue_seconds, node.type)
+    logger.debug("node started node_id=%s type=%s queue_seconds=%.4f", node_id, node.type, queue_seconds)
+
+    status = "error"
+    try:
+        result = NodeOutput.of(await handler(ctx))
+        status = "ok"
+    except asyncio.CancelledError:
+        status = "cancelled"
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        NODE_DURATION_SECONDS.observe(duration, node.type, status)
+        if timings is not None:
+            timings[node_id] = {"type": node.type, "queue_seconds": queue_seconds, "duration_seconds": duration}
+
+    output_bytes = len(result.text)
+    NODE_OUTPUT_BYTES.observe(output_bytes, node.type)
+    if timings is not None:
+        timings[node_id]["output_bytes"] = output_bytes
+        if result.meta:
+            timings[node_id]["meta"] = result.meta
+    logger.info(
+        "node finished node_id=%s type=%s duration_seconds=%.4f output_bytes=%d",
+        node_id, node.type, duration, output_bytes,
+    )
+    if memo_key is not None:
+        await memo.set(memo_key, result)
+    return result
+
+
+def map_items(plan: ExecutionPlan, map_id: str, outputs: dict) -> list:
+    """The list a map node iterates over: its input's value, or its own ``items``.
+
+    ``path`` picks a list out of a structured input ("a.b"); text is split into lines.
+    """
+    node = plan.nodes[map_id]
+    parent_ids = plan.parents[map_id]
+    if parent_ids:
+        parent = outputs[parent_ids[0]]
+        # A failed input would otherwise be split into lines and mapped over as items.
+        if not parent.is_json and parent.text.startswith(ERROR_PREFIXES):
+            raise ValueError(f"Map node {map_id} got an error from {parent_ids[0]}: {parent.text}")
+        value = parent.value
+    else:
+        value = getattr(node.data, "items", None)
+    path = getattr(node.data, "path", None)
+    for key in path.split(".") if path else ():
+        value = value.get(key) if isinstance(value, dict) else None
+    if isinstance(value, str):
+        value = [line.strip() for line in value.splitlines() if line.strip()]
+    if not isinstance(value, list):
+        raise ValueError(f"Map node {map_id} needs a list to iterate over, got {type(value).__name__}.")
+    if len(value) > MAP_MAX_ITEMS:
+        raise ValueError(f"Map node {map_id} got {len(value)} items, more than MAP_MAX_ITEMS={MAP_MAX_ITEMS}.")
+    return value
+
+
+async def run_map(
+    region: MapRegion,
+    plan: ExecutionPlan,
+    handlers: Dict[str, Handler],
+    clients: HTTPClients,
+    outputs: dict,
+    on_event: Optional[EventCallback] = None,
+    ready_at: Optional[float] = None,
+    timings: Optional[dict] = None,
+    memo: Optional[NodeMemo] = None,
+) -> Tuple[NodeOutput, NodeOutput]:
+    """Run a map node's body once per item, at most ``concurrency`` items at a time.
+
+    Each item runs as its own sub-run of the body, seeded with the item as the map node's
+    output and with the body's outside inputs. With ``itemField`` set, the item is also
+    written to that data field of the map node's children (e.g. linkedIn's profileUrl).
+    Items fail independently. Returns the map node's output, its items, and the reduce
+    node's: one result per item, None for items that did not finish, as a list or, with the
+    reduce node's ``format`` set to "text", as "--- Item n ---" sections.
+    """
+    map_id = region.map_id
+    node = plan.nodes[map_id]
+    if on_event is not None:
+        on_event("node_start", {"node_id": map_id, "type": node.type})
+    started = time.perf_counter()
+    queue_seconds = started - ready_at if ready_at is not None else 0.0
+    NODE_QUEUE_SECONDS.observe(queue_seconds, node.type)
+
+    items = map_items(plan, map_id, outputs)
+    # compile_workflow rejects bad values; per-run overrides are not recompiled, so clamp too.
+    concurrency = max(1, int(getattr(node.data, "concurrency", None) or MAP_CONCURRENCY))
+    item_field = getattr(node.data, "itemField", None)
+    slots = asyncio.Semaphore(concurrency)
+    # Body nodes may carry per-run overrides, so their definitions come from the current plan.
+    body_plan = region.plan.with_nodes({node_id: plan.nodes[node_id] for node_id in region.body})
+    first_ids = [node_id for node_id in plan.children[map_id] if node_id in body_plan.nodes]
+    seed = {node_id: outputs[node_id] for node_id in region.inputs}
+    reduce_parents = plan.parents[region.reduce_id]
+    results: List[Optional[List[NodeOutput]]] = [None] * len(items)
+    item_status = ["skipped"] * len(items)
+    errors = {}
+
+    async def run_item(index: int, item: Any):
+        item_plan = body_plan
+        if item_field:
+            item_plan = body_plan.with_nodes({
+                node_id: body_plan.nodes[node_id].model_copy(
+                    update={"data": body_plan.nodes[node_id].data.model_copy(update={item_field: item})}
+                )
+                for node_id in first_ids
+            })
+        forward = None
+        if on_event is not None:
+            forward = lambda event, data: on_event(event, {**data, "map_id": map_id, "item": index})
+        node_status = {}
+        async with slots:
+            try:
+                item_outputs = await execute_plan(
+                    item_plan, handlers, clients, on_event=forward,
+                    outputs={**seed, map_id: NodeOutput.of(item)}, only=region.body,
+                    memo=NodeMemo(memo.cache) if memo is not None else None, status=node_status,
+                )
+            except Exception as e:
+                logger.warning("map item failed map_id=%s item=%d error=%s", map_id, index, e)
+                item_status[index] = "error"
+                errors[index] = getattr(e, "detail", None) or str(e)
+            else:
+                collected = [item_outputs.get(parent_id) for parent_id in reduce_parents]
+                if None in collected:
+                    item_status[index] = next((s for s in node_status.values() if s != "ok"), "skipped")
+                else:
+                    results[index] = collected
+                    item_status[index] = "ok"
+        if on_event is not None:
+            on_event("map_item_complete", {"node_id": map_id, "item": index, "status": item_status[index]})
+
+    status = "error"
+    try:
+        async with asyncio.TaskGroup() as group:
+            for index, item in enumerate(items):
+                group.create_task(run_item(index, item))
+        status = "ok"
+    except asyncio.CancelledError:
+        status = "cancelled"
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        NODE_DURATION_SECONDS.observe(duration, node.type, status)
+        if timings is not None:
+            timings[map_id] = {
+                "type": node.type,
+                "queue_seconds": queue_seconds,
+                "duration_seconds": duration,
+                "items": len(items),
+                "concurrency": concurrency,
+            }
+
+    meta = {"items": len(items), "ok": item_status.count("ok")}
+    failed = [
+        {"item": index, "status": item_status[index], **({"error": errors[index]} if index in errors else {})}
+        for index in range(len(items))
+        if item_status[index] != "ok"
+    ]
+    if failed:
+        meta["failed"] = failed
+    logger.info(
+        "map finished node_id=%s items=%d ok=%d concurrency=%d duration_seconds=%.4f",
+        map_id, len(items), meta["ok"], concurrency, duration,
+    )
+
+    def item_value(collected: List[NodeOutput]) -> Any:
+        if len(collected) == 1:
+            return collected[0].jsonable()
+        return {parent_id: output.jsonable() for parent_id, output in zip(reduce_parents, collected)}
+
+    if getattr(plan.nodes[region.reduce_id].data, "format", None) == "text":
+        reduced = NodeOutput(text="".join(
+            f"--- Item {index + 1} ---\n" + "\n\n".join(output.text for output in collected) + "\n\n"
+            for index, collected in enumerate(results)
+            if collected is not None
+        ), meta=meta)
+    else:
+        reduced = NodeOutput(value=[None if collected is None else item_value(collected) for collected in results], meta=meta)
+    if timings is not None:
+        timings[region.reduce_id] = {
+            "type": REDUCE,
+            "queue_seconds": 0.0,
+            "duration_seconds": 0.0,
+            "output_bytes": len(reduced.text),
+            "meta": meta,
+        }
+    return NodeOutput(value=items, meta={"items": len(items), "concurrency": concurrency}), reduced
+
+
+async def execute_plan(
+    plan: ExecutionPlan,
+    handlers: Dict[str, Handler],
+    clients: HTTPClients,
+    on_event: Optional[EventCallback] = None,
+    outputs: Optional[dict] = None,
+    only: Optional[Iterable[str]] = None,
+    timings: Optional[dict] = None,
+    memo: Optional[NodeMemo] = None,
+    status: Optional[dict] = None,
+) -> dict:
+    """Run every node of the plan, starting each one as soon as all its parents are done.
+
+    ``on_event`` receives ``node_start``, ``token``, ``node_complete`` and ``node_status`` events.
+    Outputs are NodeOutput envelopes; use ``render_outputs`` to turn them into response data.
+    Nodes already present in ``outputs`` are treated as finished, and ``only`` restricts the
+    run to a subset of nodes whose parents are either in the subset or already in ``outputs``.
+    Nodes that ``status`` already records as not ``ok`` (e.g. from a shared batch pass) are
+    not run again and everything downstream of them is skipped.
+    When ``timings`` is given it is filled with a per-node breakdown of queue and run time.
+    When ``memo`` is given, memoizable nodes whose data and inputs are unchanged since an
+    earlier run are served from the node cache and listed in ``memo.hits``.
+
+    Every node runs under its type's deadline (see ``node_timeout``) and the whole run under
+    the workflow's. A node that times out skips everything downstream of it while other
+    branches carry on; when the workflow deadline passes, running nodes are cancelled. Either
+    way the outputs finished so far are returned and ``status`` records each node as ``ok``,
+    ``timeout``, ``cancelled`` or ``skipped``. A handler exception cancels the whole run.
+    With a ``HandlerRegistry``, the handlers of the selected nodes are loaded before any node
+    starts, so an unavailable node type fails the run with a 503 up front.
+
+    Map nodes run their body once per item (see ``run_map``); the body's nodes get no
+    outputs or status of their own in this run, only the map and reduce nodes do.
+    """
+    for node in plan.nodes.values():
+        if node.type not in handlers and node.type not in FLOW_TYPES:
+            raise HTTPException(status_code=400, detail=f"No handler for node type: {node.type}")
+
+    outputs = {node_id: NodeOutput.of(output) for node_id, output in (outputs or {}).items()}
+    status = {} if status is None else status
+    # Body nodes are run by their map node.
+    selected = set(plan.nodes if only is None else only) - outputs.keys() - plan.mapped_by.keys()
+    if isinstance(handlers, HandlerRegistry):
+        node_ids = set(selected)
+        for map_id in selected & plan.regions.keys():
+            node_ids.update(plan.regions[map_id].body)
+        await handlers.load({plan.nodes[node_id].type for node_id in node_ids})
+    running = set()
+    # Reduce node outputs, produced by their map node.
+    reduced = {}
+
+    def finish(node_id: str, node_status: str):
+        status[node_id] = node_status
+        if on_event is not None:
+            on_event("node_status", {"node_id": node_id, "status": node_status})
+
+    failed = {node_id for node_id, node_status in status.items() if node_status != "ok" and node_id not in outputs}
+    if failed:
+        downstream = plan.descendants(failed)
+        for node_id in plan.order:
+            if node_id in selected and node_id in downstream:
+                selected.discard(node_id)
+                if node_id not in failed:
+                    finish(node_id, "skipped")
+    remaining = {
+        node_id: sum(1 for parent_id in plan.run_parents[node_id] if parent_id not in outputs)
+        for node_id in selected
+    }
+
+    async def run(node_id: str, group: asyncio.TaskGroup):
+        node = plan.nodes[node_id]
+        running.add(node_id)
+        try:
+            async with asyncio.timeout(node_timeout(node)):
+                if node.type == MAP:
+                    region = plan.regions[node_id]
+                    output, reduced[region.reduce_id] = await run_map(
+                        region, plan, handlers, clients, outputs, on_event, time.perf_counter(), timings, memo
+                    )
+                elif node.type == REDUCE:
+                    if node_id not in reduced:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Reduce node {node_id} can only run together with map node {plan.reduced_by[node_id]}.",
+                        )
+                    output = reduced.pop(node_id)
+                else:
+                    output = await run_node(
+                        node_id, plan, handlers, clients, outputs, on_event, time.perf_counter(), timings, memo
+                    )
+        except TimeoutError:
+            running.discard(node_id)
+            logger.warning("node timed out node_id=%s type=%s timeout=%s", node_id, node.type, node_timeout(node))
+            finish(node_id, "timeout")
+            downstream = plan.descendants(plan.children[node_id])
+            for descendant_id in plan.order:
+                if descendant_id in downstream and descendant_id in remaining and descendant_id not in status:
+                    finish(descendant_id, "skipped")
+            return
+        running.discard(node_id)
+
+        outputs[node_id] = output
+        status[node_id] = "ok"
+        if on_event is not None:
+            event = {"node_id": node_id, "result": output.text}
+            if memo is not None:
+                event["cached"] = node_id in memo.hits
+            if output.meta:
+                event["meta"] = output.meta
+            on_event("node_complete", event)
+        for child_id in plan.run_children[node_id]:
+            if child_id not in remaining:
+                continue
+            remaining[child_id] -= 1
+            if remaining[child_id] == 0 and child_id not in status:
+                group.create_task(run(child_id, group))
+
+    deadline = workflow_timeout(plan)
+    try:
+        async with asyncio.timeout(deadline):
+            async with asyncio.TaskGroup() as group:
+                for node_id in plan.order:
+                    if node_id in selected and remaining[node_id] == 0:
+                        group.create_task(run(node_id, group))
+    except TimeoutError:
+        logger.warning("workflow timed out after %ss with %d node(s) running", deadline, len(running))
+        for node_id in plan.order:
+            if node_id in selected and node_id not in status:
+                finish(node_id, "cancelled" if node_id in running else "skipped")
+    except BaseExceptionGroup as e:
+        # The TaskGroup has already cancelled and awaited the other nodes; surface the cause.
+        raise e.exceptions[0] from None
+
+    return outputs
@@ -0,0 +1,118 @@
+import asyncio
+import importlib
+import logging
+import time
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Optional
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# Node type -> "module:attribute" of its handler. Modules are imported on first use, so an
+# app that never renders PDFs never imports reportlab.
+HANDLER_PATHS = {
+    "askAI": "app.handlers.askai:execute",
+    "pdfGenerator": "app.handlers.pdf_generator:execute",
+    "linkedIn": "app.handlers.linkedin:execute",
+    "typeform": "app.handlers.typeform:execute",
+    "combineText": "app.handlers.combine_text:execute",
+    "cultureFit": "app.handlers.culture_fit:execute",
+    "recordScores": "app.handlers.record_scores:execute",
+}
+
+
+class HandlerRegistry(Mapping):
+    """Node handlers by type, imported lazily.
+
+    A handler module that fails to import (e.g. linkedin without RELEVANCE_API_TOKEN) only
+    makes its own node type unavailable: runs that use it get a 503 naming the problem,
+    every other node type keeps working.
+    """
+
+    def __init__(self, paths: Dict[str, str]):
+        self.paths = dict(paths)
+        self._handlers: Dict[str, Callable] = {}
+        self._modules: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self.load_seconds: Dict[str, float] = {}
+
+    def register(self, node_type: str, handler: Callable):
+        self.paths[node_type] = f"{handler.__module__}:{handler.__name__}"
+        self._handlers[node_type] = handler
+
+    def __contains__(self, node_type: object) -> bool:
+        return node_type in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __getitem__(self, node_type: str) -> Callable:
+        handler = self._handlers.get(node_type)
+        if handler is None:
+            if node_type not in self.paths:
+                raise KeyError(node_type)
+            handler = self._import(node_type)
+        return handler
+
+    def _unavailable(self, node_type: str) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail=f"Node type {node_type} is unavailable: {self._errors[node_type]}",
+        )
+
+    def _import(self, node_type: str) -> Callable:
+        if node_type in self._errors:
+            raise self._unavailable(node_type)
+        module_name, _, attribute = self.paths[node_type].partition(":")
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(module_name)
+            handler = getattr(module, attribute)
+        except Exception as e:
+            self._errors[node_type] = f"{type(e).__name__}: {e}"
+            logger.error("could not load handler for node type %s: %s", node_type, self._errors[node_type])
+            raise self._unavailable(node_type)
+        self.load_seconds[node_type] = time.perf_counter() - started
+        self._modules[node_type] = module
+        self._handlers[node_type] = handler
+        logger.info("loaded handler for node type %s in %.3fs", node_type, self.load_seconds[node_type])
+        return handler
+
+    async def load(self, node_types: Iterable[str]):
+        """Import the handlers for node_types in a worker thread, so the event loop keeps serving."""
+        for node_type in node_types:
+            if node_type in self._handlers:
+                continue
+            if node_type in self._errors:
+                raise self._unavailable(node_type)
+            if node_type in self.paths:
+                await asyncio.to_thread(self._import, node_type)
+
+    async def preload(self, node_types: Optional[Iterable[str]] = None):
+        """Warm handlers ahead of the first request; failures are only logged."""
+        for node_type in node_types or list(self.paths):
+            try:
+                await self.load([node_type])
+            except HTTPException:
+                pass
+
+    def shutdown(self):
+        """Call the ``shutdown`` hook of every handler module that was loaded."""
+        for module in self._modules.values():
+            hook = getattr(module, "shutdown", None)
+            if callable(hook):
+                hook()
+
+    def stats(self) -> dict:
+        stats = {}
+        for node_type in self.paths:
+            if node_type in self._handlers:
+                stats[node_type] = {"status": "loaded", "load_seconds": self.load_seconds.get(node_type)}
+            elif node_type in self._errors:
+                stats[node_type] = {"status": "unavailable", "error": self._errors[node_type]}
+            else:
+                stats[node_type] = {"status": "not_loaded"}
+        return stats
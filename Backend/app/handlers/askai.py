@@ -1,75 +1,210 @@
+import asyncio
 import httpx
+import logging
 import os
 import json
-from app.models import Node
+from typing import List, Optional, Union
+from app.run_context import RunContext
+from app.utils.cache import get_cache, make_key
+from app.utils.events import token_sink
+from app.utils.http_clients import HTTPClients
+from app.utils.node_output import ERROR_PREFIXES, NodeOutput
+from app.utils.prompt_budget import build_prompt
+from app.utils.rate_limit import UpstreamThrottled, backoff_delay, get_limiter, parse_retry_after
 
-async def execute(node: Node) -> str:
+logger = logging.getLogger(__name__)
+
+OPENROUTER_API_URL = os.environ.get("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+
+GEMINI_MODEL = "google/gemini-2.0-flash-thinking-exp:free"
+DEEPSEEK_MODEL = "deepseek/deepseek-r1:free"
+
+# Free-tier providers answer bursts with 429s and transient 502/503s; these are retried.
+RETRYABLE_STATUS_CODES = {429, 502, 503}
+
+# model values that map onto a single OpenRouter model: (upstream model, label, API key variable).
+PROVIDERS = {
+    "gemini": (GEMINI_MODEL, "Gemini", "GEMINI_FLASH_THINKING_KEY"),
+    "deepseek-r1": (DEEPSEEK_MODEL, "Deepseek", "DEEPSEEK_API_KEY"),
+}
+
+# model="race" / "ensemble" ask several of the providers above, listed in the node's models.
+MULTI_MODEL_MODES = ("race", "ensemble")
+DEFAULT_MODELS = ["gemini", "deepseek-r1"]
+HEDGE_DELAY = float(os.environ.get("ASKAI_HEDGE_DELAY", "0"))
+
+# Estimated prompt tokens per provider, leaving room for the reasoning models' long answers.
+# ASKAI_PROMPT_BUDGET_<PROVIDER> overrides them and a node's tokenBudget wins over both;
+# 0 turns the budget off.
+DEFAULT_PROMPT_BUDGETS = {"gemini": 24000, "deepseek-r1": 16000}
+PROMPT_BUDGETS = {
+    provider: int(os.environ.get(f"ASKAI_PROMPT_BUDGET_{provider.upper().replace('-', '_')}", budget))
+    for provider, budget in DEFAULT_PROMPT_BUDGETS.items()
+}
+ENSEMBLE_DEADLINE = float(os.environ.get("ASKAI_ENSEMBLE_DEADLINE", "120"))
+
+async def execute(ctx: RunContext) -> Union[NodeOutput, str]:
+    """Ask one model, or several with model="race" (first valid answer wins) or "ensemble".
+
+    Inputs are compacted and fitted into the models' prompt budget; the estimated sizes are
+    reported in the output's ``meta["prompt"]``.
+    """
     gemini_api_key = os.environ.get("GEMINI_FLASH_THINKING_KEY")
     deepseek_api_key = os.environ.get("DEEPSEEK_API_KEY")
 
     if not gemini_api_key or not deepseek_api_key:
         raise ValueError("API keys for AI models are missing")
 
-    prompt = node.data.prompt or ""
-    context = node.data.context or ""
+    model = ctx.get("model") or "gemini-2.0-flash-thinking-exp-01-21"
+    use_cache = ctx.get("useCache", True) is not False
+    clients = ctx.clients
 
-    previous_results = getattr(node.data, '_previous_results', [])
-    combined_input = ""
+    if model in MULTI_MODEL_MODES:
+        providers = [resolve_provider(name) for name in ctx.get("models") or DEFAULT_MODELS]
+    else:
+        providers = [resolve_provider(model)]
+    if None in providers:
+        return "Invalid model selected."
 
-    if previous_results:
-        for result in previous_results:
-            try:
-                data = json.loads(result)
-                if isinstance(data, dict):
-                    combined_input += json.dumps(data, indent=2) + "\n\n"
-                else:
-                    combined_input += result + "\n\n"
-            except (json.JSONDecodeError, ValueError, TypeError):
-                combined_input += result + "\n\n"
+    # The prompt has to fit every model it is sent to.
+    budget = ctx.get("tokenBudget")
+    if budget is None:
+        budget = min(PROMPT_BUDGETS[provider] for provider in providers)
+    final_prompt, prompt_sizes = build_prompt(
+        ctx.get("context") or "", ctx.inputs, ctx.get("prompt") or "", int(budget)
+    )
+    if any(size["truncated"] for size in prompt_sizes["inputs"]):
+        logger.info("askAI prompt for node %s truncated to fit %s tokens", ctx.node_id, budget)
 
-    final_prompt = f"{context}\n{combined_input}\n{prompt}"
-    model = node.data.model or "gemini-2.0-flash-thinking-exp-01-21"
+    if model == "race":
+        hedge_delay = float(ctx.get("hedgeDelay", HEDGE_DELAY))
+        result = await race(providers, final_prompt, clients, use_cache, hedge_delay)
+    elif model == "ensemble":
+        deadline = float(ctx.get("deadline", ENSEMBLE_DEADLINE))
+        result = await ensemble(providers, final_prompt, clients, use_cache, deadline)
+    else:
+        result = await complete(providers[0], final_prompt, clients, use_cache, token_sink.get())
+
+    output = NodeOutput.of(result)
+    output.meta["prompt"] = prompt_sizes
+    return output
 
+def resolve_provider(model: str) -> Optional[str]:
     if model.startswith("gemini"):
-        return await call_gemini_api(final_prompt, gemini_api_key)
-    elif model == "deepseek-r1":
-        return await call_deepseek_api(final_prompt, deepseek_api_key)
-    else:
-        return "Invalid model selected."
+        return "gemini"
+    if model == "deepseek-r1":
+        return "deepseek-r1"
+    return None
 
-async def call_gemini_api(prompt: str, api_key: str) -> str:
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://app.aievaluate.xyz",
-        "X-Title": "AIVortex",
-    }
-    
-    payload = {
-        "model": "google/gemini-2.0-flash-thinking-exp:free",
-        "messages": [{"role": "user", "content": prompt}]
-    }
+def is_valid_completion(result: str) -> bool:
+    return bool(result.strip()) and not result.startswith(ERROR_PREFIXES)
+
+async def complete(provider: str, prompt: str, clients: HTTPClients, use_cache: bool, sink=None) -> str:
+    """One completion from one provider, served from the LLM cache when possible."""
+    upstream_model, label, key_variable = PROVIDERS[provider]
+    cache = get_cache("llm")
+    cache_key = make_key(upstream_model, prompt)
+    if use_cache:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            if sink is not None:
+                sink(cached)
+            return cached
+
+    # Racing providers run without a sink so their tokens do not interleave in the stream.
+    token_sink.set(sink)
+    api_key = os.environ.get(key_variable)
+    result = await call_openrouter_api(upstream_model, label, prompt, api_key, clients.get("openrouter"))
+    if use_cache and not result.startswith(ERROR_PREFIXES):
+        await cache.set(cache_key, result)
+    return result
+
+def _call_result(provider: str, task: asyncio.Task) -> str:
+    """A finished call's completion, or its exception reported as error text like other failures."""
+    error = task.exception()
+    if error is not None:
+        logger.warning("askAI call to %s failed: %r", provider, error)
+        return f"Unexpected error with {PROVIDERS[provider][1]} API: {error}"
+    return task.result()
+
+async def race(
+    providers: List[str], prompt: str, clients: HTTPClients, use_cache: bool, hedge_delay: float
+) -> Union[NodeOutput, str]:
+    """Hedged request: return the first valid completion and cancel the other calls.
+
+    Providers start in order, each hedge_delay seconds after the previous one (all at once
+    when it is 0) or as soon as a running call fails.
+    """
+    waiting = list(providers)
+    running = {}
+    errors = []
+
+    def launch():
+        provider = waiting.pop(0)
+        running[asyncio.create_task(complete(provider, prompt, clients, use_cache))] = provider
+
+    launch()
+    while waiting and hedge_delay <= 0:
+        launch()
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
-            response_data = response.json()
+        while running:
+            done, _ = await asyncio.wait(
+                running, timeout=hedge_delay if waiting else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                launch()
+                continue
+            for task in done:
+                provider = running.pop(task)
+                result = _call_result(provider, task)
+                if is_valid_completion(result):
+                    logger.info("askAI race won by %s, %d other call(s) cancelled", provider, len(running))
+                    _send_to_sink(result)
+                    return NodeOutput(text=result, meta={"model": provider})
+                errors.append(result)
+                if waiting:
+                    launch()
+    finally:
+        for task in running:
+            task.cancel()
 
-            if 'error' in response_data:
-                return f"API Error: {response_data['error'].get('message', 'Unknown error')}"
+    return errors[0]
 
-            try:
-                return response_data["choices"][0]["message"]["content"]
-            except (KeyError, IndexError):
-                return "Error processing Gemini response."
-    
-    except Exception as e:
-        return f"Unexpected error with Gemini API: {str(e)}"
+async def ensemble(
+    providers: List[str], prompt: str, clients: HTTPClients, use_cache: bool, deadline: float
+) -> Union[NodeOutput, str]:
+    """Ask every provider at once and combine the valid completions that arrive before the deadline."""
+    tasks = {provider: asyncio.create_task(complete(provider, prompt, clients, use_cache)) for provider in providers}
+    try:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    # A member that failed or missed the deadline is dropped; the node only fails without any answer.
+    results = {
+        provider: _call_result(provider, task)
+        for provider, task in tasks.items()
+        if task.done() and not task.cancelled()
+    }
+    answers = {provider: result for provider, result in results.items() if is_valid_completion(result)}
+    if not answers:
+        return f"API Error: No model returned a valid completion within {deadline:g}s."
 
-async def call_deepseek_api(prompt: str, api_key: str) -> str:
-    url = "https://openrouter.ai/api/v1/chat/completions"
+    logger.info("askAI ensemble answered by %s of %s", ", ".join(answers), ", ".join(providers))
+    result = "".join(f"--- {PROVIDERS[provider][1]} ---\n{answer}\n\n" for provider, answer in answers.items())
+    _send_to_sink(result)
+    return NodeOutput(text=result, meta={"models": list(answers)})
+
+def _send_to_sink(text: str):
+    sink = token_sink.get()
+    if sink is not None:
+        sink(text)
+
+async def call_openrouter_api(model: str, label: str, prompt: str, api_key: str, client: httpx.AsyncClient) -> str:
+    """Request a chat completion, streaming tokens to the current token sink when one is set."""
+    url = OPENROUTER_API_URL
     
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -79,22 +214,97 @@ async def call_deepseek_api(prompt: str, api_key: str) -> str:
     }
     
     payload = {
-        "model": "deepseek/deepseek-r1:free",
+        "model": model,
         "messages": [{"role": "user", "content": prompt}]
     }
 
+    sink = token_sink.get()
+    limiter = get_limiter(model)
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
-            response_data = response.json()
+        attempt = 0
+        while True:
+            async with limiter.slot():
+                try:
+                    if sink is not None:
+                        result = await _stream_completion(client, url, payload, headers, label, sink)
+                    else:
+                        result = await _post_completion(client, url, payload, headers, label)
+                except UpstreamThrottled as e:
+                    if e.status_code == 429:
+                        limiter.on_throttled(e.retry_after)
+                    if attempt >= limiter.max_retries:
+                        return f"API Error: {e.message}"
+                else:
+                    limiter.on_success()
+                    return result
+            # Back off outside the slot so other requests can use the concurrency it held.
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+    
+    except Exception as e:
+        return f"Unexpected error with {label} API: {str(e)}"
+
+def _check_throttled(status_code: int, error: dict, headers: httpx.Headers):
+    code = error.get("code") if isinstance(error.get("code"), int) else status_code
+    if code in RETRYABLE_STATUS_CODES:
+        raise UpstreamThrottled(
+            error.get("message", f"HTTP {code}"),
+            code,
+            parse_retry_after(headers.get("Retry-After")),
+        )
+
+async def _post_completion(client: httpx.AsyncClient, url: str, payload: dict, headers: dict, label: str) -> str:
+    response = await client.post(url, json=payload, headers=headers)
+    try:
+        response_data = response.json()
+    except ValueError:
+        response_data = {"error": {"message": f"HTTP {response.status_code}"}}
+
+    if 'error' in response_data:
+        _check_throttled(response.status_code, response_data['error'], response.headers)
+        return f"API Error: {response_data['error'].get('message', 'Unknown error')}"
 
-            if 'error' in response_data:
-                return f"API Error: {response_data['error'].get('message', 'Unknown error')}"
+    try:
+        return response_data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError):
+        return f"Error processing {label} response."
+
+async def _stream_completion(client: httpx.AsyncClient, url: str, payload: dict, headers: dict, label: str, sink) -> str:
+    """Consume an OpenRouter `stream: true` response, forwarding each content delta to sink."""
+    parts = []
+    async with client.stream("POST", url, json={**payload, "stream": True}, headers=headers) as response:
+        if response.status_code >= 400:
+            await response.aread()
+            try:
+                error = response.json().get("error", {})
+            except ValueError:
+                error = {}
+            _check_throttled(response.status_code, error, response.headers)
+            return f"API Error: {error.get('message', f'HTTP {response.status_code}')}"
 
+        async for line in response.aiter_lines():
+            # OpenRouter interleaves ": OPENROUTER PROCESSING" comments with the data lines.
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data)
+            except json.JSONDecodeError:
+                continue
+            if 'error' in chunk:
+                # Nothing has reached the sink yet, so the request can still be retried cleanly.
+                if not parts:
+                    _check_throttled(response.status_code, chunk['error'], response.headers)
+                return f"API Error: {chunk['error'].get('message', 'Unknown error')}"
             try:
-                return response_data["choices"][0]["message"]["content"]
+                delta = chunk["choices"][0]["delta"].get("content")
             except (KeyError, IndexError):
-                return "Error processing Deepseek response."
-    
-    except Exception as e:
-        return f"Unexpected error with Deepseek API: {str(e)}"
\ No newline at end of file
+                return f"Error processing {label} response."
+            if delta:
+                parts.append(delta)
+                sink(delta)
+
+    return "".join(parts)
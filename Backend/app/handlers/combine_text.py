@@ -1,27 +1,16 @@
-import json
-from app.models import Node
+from app.run_context import RunContext
 
-async def execute(node: Node) -> str:
+async def execute(ctx: RunContext) -> str:
     try:
         
-        previous_results = getattr(node.data, '_previous_results', [])
-        if not previous_results:
+        if not ctx.inputs:
             return "No input data provided to CombineTextNode."
 
         combined_output = ""
-        for i, result in enumerate(previous_results):
-            try:
-                data = json.loads(result)
-                if isinstance(data, dict):
-                    combined_output += f"--- Source {i+1} ---\n"
-                    combined_output += json.dumps(data, indent=2) + "\n\n"
-                else:
-                    combined_output += f"--- Source {i+1} ---\n"
-                    combined_output += result + "\n\n"
-            except (json.JSONDecodeError, ValueError, TypeError):
-                
-                combined_output += f"--- Source {i+1} ---\n"
-                combined_output += result + "\n\n"
+        for i, result in enumerate(ctx.inputs):
+            # Structured inputs render as indented JSON once and the text is shared with other consumers.
+            combined_output += f"--- Source {i+1} ---\n"
+            combined_output += result.text + "\n\n"
 
         return combined_output
 
@@ -1,42 +1,37 @@
 import json
 import logging
-from app.models import Node
+from app.run_context import RunContext
+from app.utils.scores import DEFAULT_WEIGHTS
 
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
-async def execute(node: Node) -> str:
+async def execute(ctx: RunContext) -> str:
     try:
        
-        company_values: str = getattr(node.data, "companyValues", "")
-        weights: dict = getattr(node.data, "weights", {
-            "resourcefulness": 5,
-            "optimism": 4,
-            "excitement": 4,
-            "reliability": 3,
-            "teamwork": 3
-        })
+        company_values: str = ctx.get("companyValues", "")
+        weights: dict = ctx.get("weights", DEFAULT_WEIGHTS)
 
         
         if not company_values.strip():
-            logging.error("CultureFitNode: Company values cannot be empty.")
+            logger.error("CultureFitNode: Company values cannot be empty.")
             return "Error: Company values cannot be empty."
 
         if not weights or not isinstance(weights, dict):
-            logging.error("CultureFitNode: Weights must be a non-empty dictionary.")
+            logger.error("CultureFitNode: Weights must be a non-empty dictionary.")
             return "Error: Weights must be a non-empty dictionary."
 
         for key, value in weights.items():
             if not isinstance(value, (int, float)) or value < 1 or value > 10:
-                logging.error(f"CultureFitNode: Invalid weight for {key}: {value}. Must be between 1 and 10.")
+                logger.error("CultureFitNode: Invalid weight for %s: %s. Must be between 1 and 10.", key, value)
                 return f"Error: Invalid weight for {key}: {value}. Must be between 1 and 10."
 
         
         weights_string = ", ".join([f"{key}: {value}" for key, value in weights.items()])
         culture_fit_data = f"Company Values: {company_values}\nWeights: {weights_string}"
 
-        logging.info(f"CultureFitNode Output: {culture_fit_data}")
+        logger.debug("CultureFitNode Output: %s", culture_fit_data)
         return culture_fit_data
 
     except Exception as e:
-        logging.error(f"Error in CultureFitNode: {str(e)}")
+        logger.exception("Error in CultureFitNode: %s", e)
         return f"Error in CultureFitNode: {str(e)}"
\ No newline at end of file
@@ -1,12 +1,19 @@
 import httpx
-import json
 import logging
 import os
-from app.models import Node
+from typing import Union
+from urllib.parse import urlsplit
+from app.run_context import RunContext
+from app.utils.cache import SingleFlight, get_cache
+from app.utils.http_clients import HTTPClients
+from app.utils.node_output import JSON, NodeOutput
 
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
-RELEVANCE_API_URL = "https://api-d7b62b.stack.tryrelevance.com/latest/studios/edd7c776-9aa7-4b10-af36-179eb4b4a072/trigger_webhook?project=b2e1828d4693-471f-bec4-29364bc6e8ea"
+RELEVANCE_API_URL = os.environ.get(
+    "RELEVANCE_API_URL",
+    "https://api-d7b62b.stack.tryrelevance.com/latest/studios/edd7c776-9aa7-4b10-af36-179eb4b4a072/trigger_webhook?project=b2e1828d4693-471f-bec4-29364bc6e8ea",
+)
 RELEVANCE_API_TOKEN = os.environ.get("RELEVANCE_API_TOKEN")
 RELEVANCE_PROJECT_ID = os.environ.get("RELEVANCE_PROJECT_ID")
 
@@ -33,55 +40,94 @@ SECTIONS_TO_EXTRACT = [
     "school"
 ]
 
-async def execute(node: Node) -> str:
+# Profiles change rarely; LINKEDIN_CACHE_TTL overrides this default of one week.
+PROFILE_CACHE_TTL = 7 * 24 * 3600
+
+_profile_fetches = SingleFlight()
+
+
+class RelevanceAPIError(Exception):
+    """The Relevance AI webhook answered without usable profile data."""
+
+
+def normalize_profile_url(profile_url: str) -> str:
+    """Reduce a profile URL to https://www.linkedin.com/in/<slug> so variants share a cache entry."""
+    parts = urlsplit(profile_url.strip())
+    slug = parts.path[len("/in/"):].strip("/").split("/")[0]
+    return f"https://www.linkedin.com/in/{slug.lower()}"
+
+
+async def execute(ctx: RunContext) -> Union[NodeOutput, str]:
     """Execute LinkedIn profile scraping using Relevance AI API."""
     try:
-        profile_url = getattr(node.data, "profileUrl", None)
+        profile_url = ctx.get("profileUrl")
         if not profile_url:
-            logging.error("LinkedInNode: No LinkedIn profile URL provided.")
+            logger.error("LinkedInNode: No LinkedIn profile URL provided.")
             return "Error: No LinkedIn profile URL provided."
 
         if not profile_url.startswith("https://www.linkedin.com/in/"):
-            logging.error(f"LinkedInNode: Invalid LinkedIn profile URL: {profile_url}")
+            logger.error("LinkedInNode: Invalid LinkedIn profile URL: %s", profile_url)
             return "Error: Invalid LinkedIn profile URL. URL should start with 'https://www.linkedin.com/in/'"
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"{RELEVANCE_PROJECT_ID}:{RELEVANCE_API_TOKEN}"
-        }
-        payload = {
-            "url": profile_url
-        }
-
-        logging.info(f"Calling Relevance AI API for LinkedIn profile: {profile_url}")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                RELEVANCE_API_URL,
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            response_data = response.json()
-
-        if not response_data or "error" in response_data:
-            error_message = response_data.get("error", "Unknown error from Relevance AI API")
-            logging.error(f"LinkedInNode: Relevance AI API error: {error_message}")
-            return f"Error: Failed to fetch LinkedIn profile data: {error_message}"
-
-        linkedin_data = response_data.get("linkedin_full_data", {})
-        
-        extracted_data = {}
-        for section in SECTIONS_TO_EXTRACT:
-            
-            default_value = [] if section in ["educations", "experiences", "languages"] else ""
-            extracted_data[section] = linkedin_data.get(section, default_value)
+        cache_key = normalize_profile_url(profile_url)
+        use_cache = ctx.get("useCache", True) is not False
+        if use_cache:
+            cached = await get_cache("linkedin", default_ttl=PROFILE_CACHE_TTL).get(cache_key)
+            if cached is not None:
+                logger.info("Serving cached LinkedIn profile data for %s", cache_key)
+                return NodeOutput(text=cached, media_type=JSON)
 
-        logging.info(f"Successfully fetched LinkedIn profile data for {profile_url}")
-        return json.dumps(extracted_data, indent=2)
+        if not use_cache:
+            # A fresh fetch of its own: not shared with in-flight fetches and not cached.
+            return await fetch_profile(cache_key, ctx.clients, cache=False)
+        return await _profile_fetches.do(cache_key, lambda: fetch_profile(cache_key, ctx.clients))
 
+    except RelevanceAPIError as e:
+        logger.error("LinkedInNode: Relevance AI API error: %s", e)
+        return f"Error: Failed to fetch LinkedIn profile data: {str(e)}"
     except httpx.HTTPStatusError as e:
-        logging.error(f"LinkedInNode: HTTP error while calling Relevance AI API: {str(e)}")
+        logger.error("LinkedInNode: HTTP error while calling Relevance AI API: %s", e)
         return f"Error: HTTP error while fetching LinkedIn profile data: {str(e)}"
     except Exception as e:
-        logging.error(f"LinkedInNode: Unexpected error while fetching LinkedIn profile data: {str(e)}")
-        return f"Error: Unexpected error while fetching LinkedIn profile data: {str(e)}"
\ No newline at end of file
+        logger.exception("LinkedInNode: Unexpected error while fetching LinkedIn profile data: %s", e)
+        return f"Error: Unexpected error while fetching LinkedIn profile data: {str(e)}"
+
+
+async def fetch_profile(profile_url: str, clients: HTTPClients, cache: bool = True) -> NodeOutput:
+    """Scrape one profile through Relevance AI and, unless ``cache`` is False, cache the extracted sections."""
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"{RELEVANCE_PROJECT_ID}:{RELEVANCE_API_TOKEN}"
+    }
+    payload = {
+        "url": profile_url
+    }
+
+    logger.info("Calling Relevance AI API for LinkedIn profile: %s", profile_url)
+    response = await clients.get("relevance").post(
+        RELEVANCE_API_URL,
+        headers=headers,
+        json=payload
+    )
+    response.raise_for_status()
+    response_data = response.json()
+
+    if not response_data or "error" in response_data:
+        error_message = (response_data or {}).get("error", "Unknown error from Relevance AI API")
+        raise RelevanceAPIError(error_message)
+
+    linkedin_data = response_data.get("linkedin_full_data", {})
+    
+    extracted_data = {}
+    for section in SECTIONS_TO_EXTRACT:
+        
+        default_value = [] if section in ["educations", "experiences", "languages"] else ""
+        extracted_data[section] = linkedin_data.get(section, default_value)
+
+    # Children get the dict itself; the text form is rendered once here and reused by all of them.
+    result = NodeOutput(value=extracted_data)
+    if cache:
+        await get_cache("linkedin", default_ttl=PROFILE_CACHE_TTL).set(profile_url, result.text)
+
+    logger.info("Successfully fetched LinkedIn profile data for %s", profile_url)
+    return result
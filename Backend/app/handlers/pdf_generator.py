@@ -1,119 +1,92 @@
+import asyncio
+import multiprocessing
 import os
-import uuid
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from app.models import Node
-
-async def execute(node: Node) -> str:
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Union
+from fastapi import HTTPException
+from app.run_context import RunContext
+from app.utils.node_output import NodeOutput
+from app.utils.pdf_store import get_pdf_store
+from app.utils.report_rendering import build_spec, render_pdf
+
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+PDF_MAX_QUEUE = int(os.environ.get("PDF_MAX_QUEUE", PDF_WORKERS * 4))
+
+_executor = None
+# Renders submitted and not yet finished. Released by the render's own future, since a
+# cancelled node cannot stop a render already running in a worker.
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _release(_: Future):
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+def submit_render(spec) -> Future:
+    """Queue a render in the pool, or raise a 429 when PDF_MAX_QUEUE renders are already pending."""
+    global _in_flight
+    with _in_flight_lock:
+        if _in_flight >= PDF_MAX_QUEUE:
+            raise HTTPException(
+                status_code=429,
+                detail="PDF generation queue is full, please retry shortly.",
+                headers={"Retry-After": "5"},
+            )
+        _in_flight += 1
     try:
-        output_dir = "generated_pdfs"
-        os.makedirs(output_dir, exist_ok=True)
-        pdf_filename = f"generated_{uuid.uuid4().hex}.pdf"
-        pdf_path = os.path.join(output_dir, pdf_filename)
-
-        previous_results = getattr(node.data, '_previous_results', [])
-        content = "\n\n".join(previous_results) if previous_results else node.data.content or "No content provided."
-
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        styles = getSampleStyleSheet()
-
-        title_style = ParagraphStyle(
-            name='TitleStyle',
-            fontSize=16,
-            leading=20,
-            alignment=1,
-            spaceAfter=12,
-            fontName="Helvetica-Bold",
-            textColor=colors.darkblue
-        )
-
-        heading_style = ParagraphStyle(
-            name='HeadingStyle',
-            fontSize=14,
-            leading=16,
-            spaceBefore=12,
-            spaceAfter=6,
-            fontName="Helvetica-Bold",
-            textColor=colors.darkblue
-        )
-
-        subheading_style = ParagraphStyle(
-            name='SubheadingStyle',
-            fontSize=12,
-            leading=14,
-            spaceBefore=10,
-            spaceAfter=4,
-            fontName="Helvetica-Bold",
-            textColor=colors.darkblue
-        )
-
-        body_style = ParagraphStyle(
-            name='BodyStyle',
-            fontSize=12,
-            leading=14,
-            spaceAfter=6,
-            fontName="Helvetica"
-        )
-
-        story = []
-        title = node.data.title if hasattr(node.data, 'title') else 'Candidate Evaluation Report'
-        story.append(Paragraph(title, title_style))
-        story.append(Spacer(1, 12))
-
-        sections = content.split("\n\n---\n\n")
-        for section in sections:
-            lines = section.strip().split("\n")
-            if not lines:
-                continue
-
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                if line.startswith("###"):
-                    heading = line.replace("###", "").strip()
-                    story.append(Paragraph(heading, heading_style))
-                    story.append(Spacer(1, 6))
-                    continue
-
-                if line.startswith("####"):
-                    subheading = line.replace("####", "").strip()
-                    story.append(Paragraph(subheading, subheading_style))
-                    story.append(Spacer(1, 4))
-                    continue
-
-                if line.startswith("**") and line.endswith("**"):
-                    bold_text = line.replace("**", "").strip()
-                    story.append(Paragraph(f"<b>{bold_text}</b>", body_style))
-                    continue
-
-                if line.startswith("- "):
-                    bullet_text = f"• {line[2:]}"
-                    story.append(Paragraph(bullet_text, body_style))
-                    continue
-
-                if line[0].isdigit() and line[1] == ".":
-                    numbered_text = line
-                    story.append(Paragraph(numbered_text, body_style))
-                    continue
-
-                if line.startswith("![Radar Chart]"):
-                    continue
-
-                if line.startswith("*") and line.endswith("*"):
-                    italic_text = line.replace("*", "").strip()
-                    story.append(Paragraph(f"<i>{italic_text}</i>", body_style))
-                    continue
-
-                story.append(Paragraph(line, body_style))
-
-            story.append(Spacer(1, 12))
-
-        doc.build(story)
-        return f"PDF generated successfully at {pdf_filename}"  # Return only the filename
+        future = get_executor().submit(render_pdf, spec)
+    except BaseException:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+    return future
 
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def execute(ctx: RunContext) -> Union[NodeOutput, str]:
+    """Render the report in a worker and return its bytes.
+
+    Unless the node data sets ``persist`` to false, the report is also kept in the PDF store
+    and the output text names the file to download.
+    """
+    try:
+        if ctx.inputs:
+            content = "\n\n".join(result.text for result in ctx.inputs)
+        else:
+            content = ctx.get("content") or "No content provided."
+        title = ctx.get("title", "Candidate Evaluation Report")
+        spec = build_spec(title, content)
+    except Exception as e:
+        return f"Error generating PDF: {str(e)}"
+
+    try:
+        pdf_bytes = await asyncio.wrap_future(submit_render(spec))
+
+        if ctx.get("persist", True) is False:
+            message = "PDF generated successfully (not stored)"
+        else:
+            pdf_filename = await get_pdf_store().put(pdf_bytes)
+            message = f"PDF generated successfully at {pdf_filename}"  # Return only the filename
+        return NodeOutput(data=pdf_bytes, text=message, media_type="application/pdf")
+
+    except HTTPException:
+        raise
     except Exception as e:
-        return f"Error generating PDF: {str(e)}"
\ No newline at end of file
+        return f"Error generating PDF: {str(e)}"
@@ -0,0 +1,55 @@
+import logging
+from typing import Any, Iterable, Optional, Union
+from app.run_context import RunContext
+from app.utils.node_output import NodeOutput
+from app.utils.score_store import get_score_store
+from app.utils.scores import DEFAULT_WEIGHTS, extract_scores, weighted_score
+
+logger = logging.getLogger(__name__)
+
+
+def find_field(inputs: Iterable[NodeOutput], path: str) -> Optional[str]:
+    """The first structured input value at a dotted path such as "answers.Email"."""
+    for output in inputs:
+        if not output.is_json:
+            continue
+        value: Any = output.value
+        for key in path.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+async def execute(ctx: RunContext) -> Union[NodeOutput, str]:
+    """Extract trait scores from the evaluations fed in and store them for ranking.
+
+    The candidate is named by ``candidateId`` or found in structured inputs at
+    ``candidateField``, e.g. the Typeform answer holding the applicant's email in a map body.
+    """
+    weights = ctx.get("weights") or DEFAULT_WEIGHTS
+    candidate = ctx.get("candidateId")
+    if not candidate and ctx.get("candidateField"):
+        candidate = find_field(ctx.inputs, ctx.get("candidateField"))
+    if not candidate:
+        return "Error: No candidateId given and no candidateField found in the inputs."
+
+    evaluation = "\n\n".join(output.text for output in ctx.inputs if not output.is_json)
+    scores = extract_scores(evaluation, weights)
+    if not scores:
+        return f"Error: No scores for {', '.join(weights)} found in the evaluation."
+
+    name = ctx.get("candidateName")
+    if not name and ctx.get("nameField"):
+        name = find_field(ctx.inputs, ctx.get("nameField"))
+    try:
+        await (await get_score_store()).upsert(candidate, scores, name=name)
+    except Exception as e:
+        logger.exception("could not store scores for %s", candidate)
+        return f"Error storing scores: {str(e)}"
+
+    missing = [trait for trait in weights if trait not in scores]
+    return NodeOutput(
+        value={"candidate": candidate, "name": name, "scores": scores, "score": weighted_score(scores, weights)},
+        meta={"missing_traits": missing} if missing else None,
+    )
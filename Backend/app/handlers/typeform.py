@@ -1,66 +1,172 @@
+import os
+import time
 import httpx
-import json
-from app.models import Node
+from typing import List, Union
+from app.run_context import RunContext
+from app.utils.typeform_store import FormSchema, TypeformStore, account_key, get_store
 
-async def execute(node: Node) -> str:
-    
-    form_id = getattr(node.data, "formId", None)
-    api_key = getattr(node.data, "apiKey", None)
+TYPEFORM_API_URL = os.environ.get("TYPEFORM_API_URL", "https://api.typeform.com")
+
+# How long a stored field mapping is trusted before it is revalidated with the API.
+SCHEMA_MAX_AGE = float(os.environ.get("TYPEFORM_SCHEMA_MAX_AGE", "300"))
+SYNC_PAGE_SIZE = int(os.environ.get("TYPEFORM_SYNC_PAGE_SIZE", "25"))
+# Older responses are fetched once per form, the first time more than the latest is asked for.
+BACKFILL_PAGE_SIZE = int(os.environ.get("TYPEFORM_BACKFILL_PAGE_SIZE", "200"))
+BACKFILL_MAX_PAGES = int(os.environ.get("TYPEFORM_BACKFILL_MAX_PAGES", "10"))
+
+async def execute(ctx: RunContext) -> Union[dict, List[dict], str]:
+    """The form's latest response, or with ``responses`` set to "all" or a count, a list of
+    responses newest first, e.g. to evaluate every applicant with a map node."""
+
+    form_id = ctx.get("formId")
+    api_key = ctx.get("apiKey")
     if not form_id or not api_key:
         return "Error: Form ID or API Key not provided in node data."
-    
+
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Accept": "application/json"
     }
-    
-    responses_url = f"https://api.typeform.com/forms/{form_id}/responses?sort=submitted_at,desc"
-    form_url = f"https://api.typeform.com/forms/{form_id}"
-    
+
     try:
-        async with httpx.AsyncClient() as client:
-           
-            responses_resp = await client.get(responses_url, headers=headers)
-            responses_resp.raise_for_status()
-            responses_data = responses_resp.json()
-            
-            if not responses_data.get("items"):
-                return "No responses found."
-            
-            latest_response = responses_data["items"][0]
-            
-            form_resp = await client.get(form_url, headers=headers)
-            form_resp.raise_for_status()
-            form_data = form_resp.json()
-        
-        field_mapping = {}
-        for field in form_data.get("fields", []):
-            field_id = field.get("id")
-            question = field.get("title", "Unknown Question")
-            field_mapping[field_id] = question
-        
-        result = {}
-        for answer in latest_response.get("answers", []):
-            field_id = answer["field"]["id"]
-            question_text = field_mapping.get(field_id, field_id)
-    
-            answer_type = answer.get("type")
-            if answer_type == "number":
-                response_value = answer.get("number")
-            elif answer_type == "choice":
-                response_value = answer.get("choice", {}).get("label")
-            elif answer_type == "text":
-                response_value = answer.get("text")
-            else:
-                response_value = answer.get(answer_type)
-            
-            result[question_text] = response_value
-        
-        output = {
-            "submitted_at": latest_response.get("submitted_at"),
-            "answers": result
-        }
-        return json.dumps(output, indent=2)
-    
+        client = ctx.clients.get("typeform")
+        store = get_store()
+        account = account_key(api_key)
+
+        responses = ctx.get("responses") or "latest"
+        single = responses == "latest"
+        limit = 1 if single else None if responses == "all" else max(int(responses), 1)
+
+        await sync_responses(client, store, account, form_id, headers)
+        if not single:
+            await backfill_responses(client, store, account, form_id, headers)
+        latest = await store.latest_responses(account, form_id, limit=limit)
+        if not latest:
+            return "No responses found." if single else []
+
+        field_mapping = await get_field_mapping(client, store, account, form_id, headers)
+        if single:
+            return format_response(latest[0], field_mapping)
+        return [format_response(response, field_mapping) for response in latest]
+
     except Exception as e:
         return f"Error fetching Typeform responses: {str(e)}"
+
+def format_response(response: dict, field_mapping: dict) -> dict:
+    result = {}
+    for answer in response.get("answers", []):
+        field_id = answer["field"]["id"]
+        question_text = field_mapping.get(field_id, field_id)
+
+        answer_type = answer.get("type")
+        if answer_type == "number":
+            response_value = answer.get("number")
+        elif answer_type == "choice":
+            response_value = answer.get("choice", {}).get("label")
+        elif answer_type == "text":
+            response_value = answer.get("text")
+        else:
+            response_value = answer.get(answer_type)
+
+        result[question_text] = response_value
+
+    return {
+        "submitted_at": response.get("submitted_at"),
+        "answers": result
+    }
+
+async def get_field_mapping(
+    client: httpx.AsyncClient, store: TypeformStore, account: str, form_id: str, headers: dict
+) -> dict:
+    """Return the form's field id -> question title mapping, revalidating the stored copy with ETags."""
+    cached = await store.get_form(account, form_id)
+    if cached and time.time() - cached.checked_at < SCHEMA_MAX_AGE:
+        return cached.fields
+
+    request_headers = dict(headers)
+    if cached and cached.etag:
+        request_headers["If-None-Match"] = cached.etag
+    if cached and cached.last_modified:
+        request_headers["If-Modified-Since"] = cached.last_modified
+
+    form_resp = await client.get(f"{TYPEFORM_API_URL}/forms/{form_id}", headers=request_headers)
+    if cached and form_resp.status_code == 304:
+        await store.touch_form(account, form_id)
+        return cached.fields
+    form_resp.raise_for_status()
+    form_data = form_resp.json()
+
+    field_mapping = {}
+    for field in form_data.get("fields", []):
+        field_id = field.get("id")
+        question = field.get("title", "Unknown Question")
+        field_mapping[field_id] = question
+
+    await store.save_form(account, form_id, FormSchema(
+        fields=field_mapping,
+        etag=form_resp.headers.get("ETag"),
+        last_modified=form_resp.headers.get("Last-Modified"),
+        checked_at=time.time(),
+    ))
+    return field_mapping
+
+async def sync_responses(
+    client: httpx.AsyncClient, store: TypeformStore, account: str, form_id: str, headers: dict
+) -> int:
+    """Pull responses submitted since the newest stored one into the local store.
+
+    A form seen for the first time only fetches its latest response; later runs page
+    through every response ``since`` the newest stored timestamp, newest first, and store
+    them together once the whole gap is fetched. The newest stored timestamp is where the
+    next sync starts, so storing only part of the gap would skip the rest for good.
+    Returns the number of new rows.
+    """
+    latest = await store.latest_submitted_at(account, form_id)
+    if not latest:
+        params = {"sort": "submitted_at,desc", "page_size": 1}
+        responses_resp = await client.get(f"{TYPEFORM_API_URL}/forms/{form_id}/responses", params=params, headers=headers)
+        responses_resp.raise_for_status()
+        return await store.add_responses(account, form_id, responses_resp.json().get("items") or [])
+
+    items = []
+    before = None
+    while True:
+        params = {"sort": "submitted_at,desc", "page_size": SYNC_PAGE_SIZE, "since": latest}
+        if before:
+            params["before"] = before
+        responses_resp = await client.get(f"{TYPEFORM_API_URL}/forms/{form_id}/responses", params=params, headers=headers)
+        responses_resp.raise_for_status()
+        page = responses_resp.json().get("items") or []
+        items.extend(page)
+        if len(page) < SYNC_PAGE_SIZE:
+            break
+        before = page[-1].get("token") or page[-1].get("response_id")
+        if not before:
+            break
+    return await store.add_responses(account, form_id, items)
+
+async def backfill_responses(
+    client: httpx.AsyncClient, store: TypeformStore, account: str, form_id: str, headers: dict
+) -> int:
+    """Page back from the oldest stored response until the form's first one, once per form.
+
+    Stops after BACKFILL_MAX_PAGES pages; the next run carries on from where it stopped.
+    Returns the number of new rows.
+    """
+    if await store.is_backfilled(account, form_id):
+        return 0
+    added = 0
+    before = await store.oldest_response_id(account, form_id)
+    for _ in range(BACKFILL_MAX_PAGES):
+        params = {"sort": "submitted_at,desc", "page_size": BACKFILL_PAGE_SIZE}
+        if before:
+            params["before"] = before
+        responses_resp = await client.get(f"{TYPEFORM_API_URL}/forms/{form_id}/responses", params=params, headers=headers)
+        responses_resp.raise_for_status()
+        items = responses_resp.json().get("items") or []
+        added += await store.add_responses(account, form_id, items)
+        if len(items) < BACKFILL_PAGE_SIZE:
+            await store.mark_backfilled(account, form_id)
+            break
+        before = items[-1].get("token") or items[-1].get("response_id")
+    return added
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+from fastapi import HTTPException
+from app.executor import EventCallback
+from app.utils.graph_utils import ExecutionPlan
+
+JobRunner = Callable[[ExecutionPlan, EventCallback], Awaitable[dict]]
+
+
+@dataclass
+class Job:
+    id: str
+    plan: Optional[ExecutionPlan]
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    outputs: dict = field(default_factory=dict)
+    node_status: dict = field(default_factory=dict)
+    error: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "results": self.outputs,
+            "node_status": self.node_status,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """In-process workflow job queue drained by a fixed number of worker tasks.
+
+    The worker count caps how many workflows run at once; finished jobs are kept
+    for ``retention_seconds`` and at most ``max_retained`` of them are held.
+    """
+
+    def __init__(self, runner: JobRunner, workers: int, max_queue: int, retention_seconds: float, max_retained: int):
+        self.runner = runner
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.max_retained = max_retained
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls, runner: JobRunner) -> "JobManager":
+        return cls(
+            runner,
+            workers=int(os.environ.get("JOB_WORKERS", "4")),
+            max_queue=int(os.environ.get("JOB_QUEUE_SIZE", "100")),
+            retention_seconds=float(os.environ.get("JOB_RETENTION_SECONDS", "3600")),
+            max_retained=int(os.environ.get("JOB_MAX_RETAINED", "1000")),
+        )
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, plan: ExecutionPlan) -> Job:
+        self._prune()
+        job = Job(id=uuid.uuid4().hex, plan=plan)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=429,
+                detail="Workflow job queue is full, please retry shortly.",
+                headers={"Retry-After": "5"},
+            )
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        job.started_at = time.time()
+
+        def on_event(event: str, data: dict):
+            if "map_id" in data:
+                # Per-item events from inside a map node; its reduce node reports the results.
+                return
+            if event == "node_complete":
+                job.outputs[data["node_id"]] = data["result"]
+                job.node_status[data["node_id"]] = "ok"
+            elif event == "node_status":
+                job.node_status[data["node_id"]] = data["status"]
+
+        try:
+            job.outputs = await self.runner(job.plan, on_event)
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = {"status_code": 503, "detail": "Job cancelled during shutdown."}
+            raise
+        except HTTPException as e:
+            job.status = "failed"
+            job.error = {"status_code": e.status_code, "detail": e.detail}
+        except Exception as e:
+            job.status = "failed"
+            job.error = {"status_code": 500, "detail": str(e)}
+        finally:
+            job.finished_at = time.time()
+            job.plan = None
+            self._finished[job.id] = job.finished_at
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at >= cutoff and len(self._finished) <= self.max_retained:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
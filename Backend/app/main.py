@@ -1,20 +1,85 @@
+from app.utils.startup import StartupReport
+
+# Created before anything else is imported so the report covers the app's own imports.
+startup_report = StartupReport()
+
 import uvicorn
 import os
+import re
+import sys
 import asyncio
-from fastapi import FastAPI, HTTPException
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.models import Workflow, Node, Edge
-from app.utils.graph_utils import get_start_nodes, get_outgoers
+from pydantic import ValidationError
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.models import BatchWorkflowRequest, NodeData, RankRequest, Workflow, WorkflowRunRequest
+from app.utils.graph_utils import FLOW_TYPES, ExecutionPlan, WorkflowGraphError, compile_workflow
+from app.executor import EventCallback, execute_plan
+from app.handlers import HANDLER_PATHS, HandlerRegistry
+from app.jobs import JobManager
+from app.memo import NodeMemo
+from app.utils.cache import cache_stats, close_caches
+from app.utils.codec import decoded_body, document_bodies, encoded_response, request_body
+from app.utils.events import format_sse
+from app.utils.http_clients import HTTPClients
+from app.utils.metrics import WORKFLOW_DURATION_SECONDS, render_prometheus
+from app.utils.node_output import render_outputs
+from app.utils.pdf_store import get_pdf_store
+from app.utils.rate_limit import limiter_stats
+from app.utils.scores import DEFAULT_WEIGHTS
+from app.utils.typeform_store import close_store
+from app.utils.workflow_store import close_workflow_store, get_workflow_store
 from dotenv import load_dotenv
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 
 load_dotenv()
 
-from app.handlers import askai, pdf_generator, linkedin, typeform, combine_text, culture_fit
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+)
+logger = logging.getLogger(__name__)
+startup_report.mark("imports")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_report.mark("app")
+    app.state.http_clients = HTTPClients.from_env()
+    startup_report.mark("http_clients")
+    await get_pdf_store().evict()
+    startup_report.mark("pdf_store")
+
+    async def run_job(plan: ExecutionPlan, on_event: EventCallback) -> dict:
+        async with observe_run("jobs"):
+            outputs = await execute_plan(plan, NODE_HANDLERS, app.state.http_clients, on_event=on_event)
+        return render_outputs(outputs)
+
+    app.state.batch_slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    app.state.jobs = JobManager.from_env(run_job)
+    app.state.jobs.start()
+    startup_report.mark("jobs")
+    startup_report.finish()
+    preload = asyncio.create_task(NODE_HANDLERS.preload(PRELOAD_HANDLERS)) if PRELOAD_HANDLERS else None
+    yield
+    if preload is not None:
+        preload.cancel()
+    await app.state.jobs.stop()
+    await app.state.http_clients.aclose()
+    close_caches()
+    close_store()
+    close_workflow_store()
+    # The score store (and numpy) is only imported once a /scores endpoint or node used it.
+    score_store = sys.modules.get("app.utils.score_store")
+    if score_store is not None:
+        score_store.close_score_store()
+    NODE_HANDLERS.shutdown()
 
-app = FastAPI(debug=True)
-app.mount("/generated_pdfs", StaticFiles(directory="generated_pdfs"), name="generated_pdfs")
+app = FastAPI(debug=True, lifespan=lifespan)
+document_bodies(app)
 
 
 origins = [
@@ -35,196 +100,375 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-NODE_HANDLERS = {
-    "askAI": askai.execute,
-    "pdfGenerator": pdf_generator.execute,
-    "linkedIn": linkedin.execute,
-    "typeform": typeform.execute,
-    "combineText": combine_text.execute,
-    "cultureFit": culture_fit.execute,  
-}
-
-
-print("NODE_HANDLERS keys:", list(NODE_HANDLERS.keys()))
-
-async def execute_node_and_children(
-    node_id: str,
-    nodes_map: dict,
-    edges: list,
-    executed: set,
-    outputs: dict,
-    executing: set = None,
-    scheduled: set = None,
-    execute_children: bool = True,
+# Handler modules are imported the first time a workflow needs them; PRELOAD_HANDLERS
+# ("all" or a comma-separated list of node types) warms them in the background after startup.
+NODE_HANDLERS = HandlerRegistry(HANDLER_PATHS)
+_preload = os.environ.get("PRELOAD_HANDLERS", "").strip()
+PRELOAD_HANDLERS = list(NODE_HANDLERS) if _preload == "all" else [t.strip() for t in _preload.split(",") if t.strip()]
+
+logger.info("registered node handlers: %s", ", ".join(NODE_HANDLERS))
+
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+
+@asynccontextmanager
+async def observe_run(endpoint: str):
+    started = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        WORKFLOW_DURATION_SECONDS.observe(time.perf_counter() - started, endpoint, status)
+
+def build_plan(workflow: Workflow) -> ExecutionPlan:
+    logger.debug("compiling workflow nodes=%d edges=%d", len(workflow.nodes), len(workflow.edges))
+
+    try:
+        plan = compile_workflow(workflow)
+    except WorkflowGraphError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not plan.start_ids:
+        raise HTTPException(status_code=400, detail="No start nodes found in the workflow.")
+
+    for node in plan.nodes.values():
+        if node.type not in NODE_HANDLERS and node.type not in FLOW_TYPES:
+            raise HTTPException(status_code=400, detail=f"No handler for node type: {node.type}")
+
+    return plan
+
+@app.post("/execute-workflow", openapi_extra=request_body(Workflow))
+async def execute_workflow(
+    request: Request,
+    workflow: Workflow = Depends(decoded_body(Workflow)),
+    timings: bool = False,
+    incremental: bool = False,
+    structured: bool = False,
 ):
-    if executing is None:
-        executing = set()
-    if scheduled is None:
-        scheduled = set()
-    
-    if node_id in executed:
-        print(f"Node {node_id} already executed, returning result: {outputs[node_id]}")
-        return outputs[node_id]
-    
-    if node_id in executing:
-        raise HTTPException(status_code=400, detail=f"Circular dependency detected for node: {node_id}")
-    
-    executing.add(node_id)
-    
-    node: Node = nodes_map[node_id]
-    
-    print(f"Starting execution of node: {node_id}, Type: {node.type}")
-    
-    handler = NODE_HANDLERS.get(node.type)
-    if not handler:
-        executing.remove(node_id)
-        raise HTTPException(status_code=400, detail=f"No handler for node type: {node.type}")
-    
-    parent_nodes = []
-    for edge in edges:
-        if edge.target == node_id:
-            parent_nodes.append(edge.source)
-    
-    print(f"Parent nodes for {node_id}: {parent_nodes}")
-    
-    if parent_nodes:
-        parent_tasks = []
-        for parent_id in parent_nodes:
-            if parent_id not in executed and parent_id not in scheduled:
-                print(f"Scheduling execution of parent node: {parent_id}")
-                scheduled.add(parent_id)
-                task = asyncio.create_task(
-                    execute_node_and_children(parent_id, nodes_map, edges, executed, outputs, executing, scheduled)
-                )
-                parent_tasks.append(task)
-        
-        if parent_tasks:
-            print(f"Waiting for {len(parent_tasks)} parent tasks to complete for node {node_id}")
-            await asyncio.gather(*parent_tasks)
-            print(f"All parent tasks for node {node_id} completed")
-    
-    if node.type == "askAI":
-        culture_fit_parent = None
-        for parent_id in parent_nodes:
-            parent_node = nodes_map[parent_id]
-            if parent_node.type == "cultureFit" and parent_id in outputs:
-                culture_fit_parent = parent_id
-                break
-        
-        if culture_fit_parent:
-            print(f"Found CultureFitNode parent {culture_fit_parent} for AskAINode {node_id}")
-            node.data.context = outputs[culture_fit_parent]
-            print(f"Set context for AskAINode {node_id} to: {node.data.context}")
-        else:
-            print(f"No CultureFitNode parent found for AskAINode {node_id}, using existing context: {node.data.context}")
-    
-    incoming_results = []
-    for edge in edges:
-        if edge.target == node_id:
-            source_node = nodes_map[edge.source]
-            if node.type == "askAI" and source_node.type == "cultureFit":
-                continue
-            if edge.source in outputs:
-                incoming_results.append(outputs[edge.source])
-            else:
-                print(f"Warning: Parent node {edge.source} for node {node_id} has not completed execution or result is missing in outputs")
-    
-    print(f"Incoming results for node {node_id}: {incoming_results}")
-    
-    setattr(node.data, '_previous_results', incoming_results)
-    
-    print(f"Executing handler for node {node_id}")
-    result = await handler(node)
-    outputs[node_id] = result
-    executed.add(node_id)
-    
-    print(f"Node {node_id} executed, result: {result}")
-    
-    executing.remove(node_id)
-    
-    if not execute_children:
-        print(f"Skipping child execution for node {node_id}")
-        return result
-    
-    children_ids = get_outgoers(node_id, edges)
-    
-    print(f"Child nodes for {node_id}: {children_ids}")
-    
-    child_tasks = []
-    for child_id in children_ids:
-        if child_id not in executed and child_id not in scheduled:
-            print(f"Scheduling execution of child node: {child_id}")
-            scheduled.add(child_id)
-            task = asyncio.create_task(
-                execute_node_and_children(child_id, nodes_map, edges, executed, outputs, executing, scheduled)
-            )
-            child_tasks.append(task)
-    
-    if child_tasks:
-        print(f"Waiting for {len(child_tasks)} child tasks to complete for node {node_id}")
-        await asyncio.gather(*child_tasks)
-        print(f"All child tasks for node {node_id} completed")
-    
-    return result
+    """Run a workflow. With ``incremental=true`` nodes unchanged since an earlier run are served
+    from the node cache and listed under ``cached``. With ``structured=true`` JSON node outputs
+    are embedded as objects instead of JSON-encoded strings.
+
+    Bodies and responses may be MessagePack instead of JSON (see app.utils.codec)."""
+    plan = build_plan(workflow)
+    return await run_workflow(plan, request, "execute-workflow", timings, incremental, structured)
 
-@app.post("/execute-workflow")
-async def execute_workflow(workflow: Workflow):
+async def run_workflow(
+    plan: ExecutionPlan, request: Request, endpoint: str, timings: bool, incremental: bool, structured: bool
+) -> Response:
     try:
-        print("Nodes in workflow:")
-        for node in workflow.nodes:
-            print(f"Node ID: {node.id}, Type: {node.type}")
-
-        nodes_map = {node.id: node for node in workflow.nodes}
-        start_nodes = get_start_nodes(workflow.nodes, workflow.edges)
-        if not start_nodes:
-            raise HTTPException(status_code=400, detail="No start nodes found in the workflow.")
-
-        outputs = {}
-        executed = set()
-        scheduled = set()
-
-        start_tasks = []
-        for node in start_nodes:
-            if node.id not in scheduled:
-                print(f"Scheduling execution of start node: {node.id}")
-                scheduled.add(node.id)
-                task = asyncio.create_task(
-                    execute_node_and_children(node.id, nodes_map, workflow.edges, executed, outputs, scheduled=scheduled, execute_children=False)
-                )
-                start_tasks.append(task)
-        
-        print(f"Waiting for {len(start_tasks)} start tasks to complete")
-        await asyncio.gather(*start_tasks)
-        print("All start tasks completed")
-
-        start_node_children = set()
-        for node in start_nodes:
-            children_ids = get_outgoers(node.id, workflow.edges)
-            start_node_children.update(children_ids)
-
-        child_tasks = []
-        for child_id in start_node_children:
-            if child_id not in executed and child_id not in scheduled:
-                print(f"Scheduling execution of child node of start node: {child_id}")
-                scheduled.add(child_id)
-                task = asyncio.create_task(
-                    execute_node_and_children(child_id, nodes_map, workflow.edges, executed, outputs, scheduled=scheduled)
-                )
-                child_tasks.append(task)
-        
-        if child_tasks:
-            print(f"Waiting for {len(child_tasks)} child tasks to complete")
-            await asyncio.gather(*child_tasks)
-            print("All child tasks of start nodes completed")
-
-        return {"results": outputs}
+        node_timings = {} if timings else None
+        memo = NodeMemo() if incremental else None
+        status = {}
+        async with observe_run(endpoint):
+            outputs = await execute_plan(
+                plan, NODE_HANDLERS, request.app.state.http_clients, timings=node_timings, memo=memo, status=status
+            )
+        response = {"results": render_outputs(outputs, structured, raw=True), "status": status}
+        if timings:
+            response["timings"] = node_timings
+        if incremental:
+            response["cached"] = [node_id for node_id in plan.order if node_id in memo.hits]
+        return await encoded_response(request, response)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print("Error in workflow execution:")
-        print(traceback.format_exc())
+        logger.exception("workflow execution failed")
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_response(run: Callable[[EventCallback], Awaitable[None]]) -> StreamingResponse:
+    """Stream the events emitted by run() as Server-Sent Events, with heartbeats while idle."""
+    queue = asyncio.Queue()
+
+    def emit(event: str, data: dict):
+        queue.put_nowait((event, data))
+
+    async def produce():
+        try:
+            await run(emit)
+        except HTTPException as e:
+            emit("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.exception("streamed workflow execution failed")
+            emit("error", {"status_code": 500, "detail": str(e)})
+        finally:
+            queue.put_nowait(None)
+
+    async def event_stream():
+        task = asyncio.create_task(produce())
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment lines keep proxies and load balancers from closing an idle stream.
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                yield format_sse(*item)
+        finally:
+            # Runs when the client disconnects too, so abandoned workflows stop early.
+            task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/execute-workflow/stream", openapi_extra=request_body(Workflow))
+async def execute_workflow_stream(
+    request: Request, workflow: Workflow = Depends(decoded_body(Workflow)), incremental: bool = False
+):
+    plan = build_plan(workflow)
+    # Load handlers before the stream starts, so an unavailable node type is a plain 503.
+    await NODE_HANDLERS.load({node.type for node in plan.nodes.values()})
+    clients = request.app.state.http_clients
+
+    async def run(emit: EventCallback):
+        memo = NodeMemo() if incremental else None
+        status = {}
+        async with observe_run("execute-workflow/stream"):
+            outputs = await execute_plan(plan, NODE_HANDLERS, clients, on_event=emit, memo=memo, status=status)
+        emit("workflow_complete", {"results": render_outputs(outputs), "status": status})
+
+    return sse_response(run)
+
+def apply_overrides(plan: ExecutionPlan, overrides: Dict[str, Dict[str, Any]]) -> ExecutionPlan:
+    """Return a plan whose overridden nodes are copies with the per-run data applied.
+
+    Node definitions are never modified while running, so every other node is shared.
+    Overridden data is validated like a submitted workflow's; invalid fields are a 400.
+    """
+    nodes = {}
+    for node_id, fields in overrides.items():
+        node = plan.nodes[node_id]
+        try:
+            data = NodeData.model_validate({**node.data.model_dump(), **fields})
+        except ValidationError as e:
+            problems = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+            raise HTTPException(status_code=400, detail=f"Invalid overrides for node {node_id}: {problems}")
+        nodes[node_id] = node.model_copy(update={"data": data})
+    return plan.with_nodes(nodes)
+
+@app.post("/execute-workflow/batch", openapi_extra=request_body(BatchWorkflowRequest))
+async def execute_workflow_batch(
+    request: Request, batch: BatchWorkflowRequest = Depends(decoded_body(BatchWorkflowRequest))
+):
+    """Run one workflow template for many candidates, streaming each candidate's results as SSE.
+
+    Nodes not downstream of any overridden node are executed once and shared by every candidate.
+    """
+    plan = build_plan(batch.workflow)
+    overridden = {node_id for candidate in batch.candidates for node_id in candidate}
+    unknown = overridden - plan.nodes.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Overrides reference unknown nodes: {', '.join(sorted(unknown))}")
+
+    # Built up front so a bad override fails the request rather than one streamed candidate.
+    candidate_plans = [apply_overrides(plan, overrides) for overrides in batch.candidates]
+
+    await NODE_HANDLERS.load({node.type for node in plan.nodes.values()})
+    per_candidate = plan.descendants(overridden)
+    shared_ids = [node_id for node_id in plan.order if node_id not in per_candidate]
+    clients = request.app.state.http_clients
+    global_slots = request.app.state.batch_slots
+    request_slots = asyncio.Semaphore(batch.concurrency or len(batch.candidates) or 1)
+
+    async def run_candidate(
+        emit: EventCallback, index: int, candidate_plan: ExecutionPlan, shared: dict, shared_status: dict
+    ):
+        async with request_slots, global_slots:
+            # Shared nodes that timed out are not retried per candidate; their descendants are skipped.
+            status = dict(shared_status)
+            try:
+                outputs = await execute_plan(candidate_plan, NODE_HANDLERS, clients, outputs=shared, status=status)
+            except HTTPException as e:
+                emit("candidate_error", {"index": index, "status_code": e.status_code, "detail": e.detail})
+                return
+            except Exception as e:
+                emit("candidate_error", {"index": index, "status_code": 500, "detail": str(e)})
+                return
+        # Timed-out nodes and map bodies have no output of their own.
+        results = render_outputs({
+            node_id: outputs[node_id] for node_id in plan.order if node_id in per_candidate and node_id in outputs
+        })
+        status = {node_id: status[node_id] for node_id in plan.order if node_id in per_candidate and node_id in status}
+        emit("candidate_complete", {"index": index, "results": results, "status": status})
+
+    async def run(emit: EventCallback):
+        async with observe_run("execute-workflow/batch"):
+            shared_status = {}
+            shared = await execute_plan(plan, NODE_HANDLERS, clients, only=shared_ids, status=shared_status)
+            emit("shared_complete", {"results": render_outputs(shared), "status": shared_status})
+            await asyncio.gather(*(
+                run_candidate(emit, index, candidate_plan, shared, shared_status)
+                for index, candidate_plan in enumerate(candidate_plans)
+            ))
+        emit("batch_complete", {"candidates": len(batch.candidates)})
+
+    return sse_response(run)
+
+@app.post("/execute-workflow/pdf", openapi_extra=request_body(Workflow))
+async def execute_workflow_pdf(
+    request: Request, workflow: Workflow = Depends(decoded_body(Workflow)), node_id: Optional[str] = None
+):
+    """Run the nodes a pdfGenerator node depends on and stream its report back without storing it.
+
+    ``node_id`` picks the report node when the workflow has more than one.
+    """
+    plan = build_plan(workflow)
+    # Reports inside a map node's body are per item and cannot be streamed on their own.
+    pdf_ids = [pid for pid in plan.order if plan.nodes[pid].type == "pdfGenerator" and pid not in plan.mapped_by]
+    if node_id is None:
+        if len(pdf_ids) != 1:
+            raise HTTPException(status_code=400, detail="Pass node_id to choose one of the workflow's pdfGenerator nodes.")
+        node_id = pdf_ids[0]
+    elif node_id not in pdf_ids:
+        raise HTTPException(status_code=400, detail=f"Node {node_id} is not a pdfGenerator node.")
+
+    plan = apply_overrides(plan, {node_id: {"persist": False}})
+    async with observe_run("execute-workflow/pdf"):
+        outputs = await execute_plan(
+            plan, NODE_HANDLERS, request.app.state.http_clients, only=plan.ancestors([node_id])
+        )
+
+    report = outputs[node_id]
+    if report.media_type != "application/pdf":
+        raise HTTPException(status_code=500, detail=report.text)
+
+    def chunks(data: bytes, size: int = 64 * 1024):
+        view = memoryview(data)
+        for start in range(0, len(view), size):
+            yield view[start:start + size]
+
+    return StreamingResponse(
+        chunks(report.data),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="{re.sub(r"[^A-Za-z0-9_.-]", "_", node_id)}.pdf"',
+            "Content-Length": str(len(report.data)),
+        },
+    )
+
+@app.post("/workflows/jobs", status_code=202, openapi_extra=request_body(Workflow))
+async def submit_workflow_job(request: Request, workflow: Workflow = Depends(decoded_body(Workflow))):
+    plan = build_plan(workflow)
+    job = request.app.state.jobs.submit(plan)
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/workflows/jobs")
+async def get_workflow_job_stats(request: Request):
+    return request.app.state.jobs.stats()
+
+@app.get("/workflows/jobs/{job_id}")
+async def get_workflow_job(job_id: str, request: Request):
+    job = request.app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await encoded_response(request, job.to_dict())
+
+@app.post("/workflows", status_code=201, openapi_extra=request_body(Workflow))
+async def save_workflow(workflow: Workflow = Depends(decoded_body(Workflow))):
+    """Validate, compile and store a workflow so it can be run by id."""
+    plan = build_plan(workflow)
+    workflow_id = await get_workflow_store().save(workflow, plan)
+    return {"id": workflow_id, "nodes": len(plan.nodes), "edges": sum(plan.in_degree.values())}
+
+@app.get("/workflows/{workflow_id}")
+async def get_workflow(workflow_id: str):
+    definition = await get_workflow_store().get_definition(workflow_id)
+    if definition is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    # Stored as validated JSON already, so it is sent back as is.
+    return Response(content=definition, media_type="application/json")
+
+@app.delete("/workflows/{workflow_id}", status_code=204)
+async def delete_workflow(workflow_id: str):
+    if not await get_workflow_store().delete(workflow_id):
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+@app.post("/workflows/{workflow_id}/run", openapi_extra=request_body(WorkflowRunRequest))
+async def run_saved_workflow(
+    workflow_id: str,
+    request: Request,
+    run: WorkflowRunRequest = Depends(decoded_body(WorkflowRunRequest)),
+    timings: bool = False,
+    incremental: bool = False,
+    structured: bool = False,
+):
+    """Run a saved workflow with per-run node data overrides; responds like /execute-workflow."""
+    plan = await get_workflow_store().get_plan(workflow_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    unknown = run.overrides.keys() - plan.nodes.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Overrides reference unknown nodes: {', '.join(sorted(unknown))}")
+
+    plan = apply_overrides(plan, run.overrides)
+    if run.timeout is not None:
+        plan = replace(plan, timeout=run.timeout)
+    return await run_workflow(plan, request, "workflows/run", timings, incremental, structured)
+
+@app.post("/scores/rank")
+async def rank_candidates(ranking: RankRequest):
+    """Re-rank every scored candidate under new trait weights, without calling an LLM."""
+    from app.utils.score_store import get_score_store
+
+    weights = ranking.weights or DEFAULT_WEIGHTS
+    store = await get_score_store()
+    await store.refresh()
+    return {"weights": weights, **store.rank(weights, ranking.k, ranking.min_coverage)}
+
+@app.get("/scores/stats")
+async def get_score_stats():
+    from app.utils.score_store import get_score_store
+
+    store = await get_score_store()
+    await store.refresh()
+    return store.stats()
+
+@app.get("/scores/candidates/{candidate_id}")
+async def get_candidate_scores(candidate_id: str):
+    from app.utils.score_store import get_score_store
+
+    store = await get_score_store()
+    await store.refresh()
+    scores = store.get(candidate_id)
+    if scores is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return scores
+
+@app.delete("/scores/candidates/{candidate_id}", status_code=204)
+async def delete_candidate_scores(candidate_id: str):
+    from app.utils.score_store import get_score_store
+
+    if not await (await get_score_store()).delete(candidate_id):
+        raise HTTPException(status_code=404, detail="Candidate not found")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return cache_stats()
+
+@app.get("/pdf-store/stats")
+async def get_pdf_store_stats():
+    return get_pdf_store().stats()
+
+@app.get("/startup")
+async def get_startup_report():
+    return {**startup_report.as_dict(), "handlers": NODE_HANDLERS.stats()}
+
+@app.get("/rate-limits")
+async def get_rate_limits():
+    return limiter_stats()
+
 @app.get("/test-env")
 async def test_env():
     api_key = os.environ.get("GEMINI_API_KEY", "Not found")
@@ -234,16 +478,27 @@ async def test_env():
         "li_at_prefix": li_at[:5] + "..." if len(li_at) > 5 else "Not found"
     }
 
+def kept_pdf(filename: str) -> str:
+    """Path of a report the store still keeps; evicted or expired reports are a 404."""
+    file_path = get_pdf_store().path(filename)
+    if file_path is None:
+        raise HTTPException(status_code=404, detail="PDF not found")
+    return file_path
+
+
 @app.get("/download-pdf/{filename}")
 async def download_pdf(filename: str):
-    file_path = os.path.join("generated_pdfs", filename)
-    if os.path.exists(file_path):
-        return FileResponse(
-            file_path,
-            media_type="application/pdf",
-            filename=filename
-        )
-    raise HTTPException(status_code=404, detail="PDF not found")
+    return FileResponse(
+        kept_pdf(filename),
+        media_type="application/pdf",
+        filename=filename
+    )
+
+
+@app.get("/generated_pdfs/{filename}")
+async def view_pdf(filename: str):
+    # Served inline, as the static mount this replaces did, but under the store's age limit.
+    return FileResponse(kept_pdf(filename), media_type="application/pdf")
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import hashlib
+import json
+from typing import Dict, List, Optional
+from app.models import Node
+from app.utils.cache import TieredCache, get_cache, make_key
+from app.utils.node_output import ERROR_PREFIXES, NodeOutput
+
+# Node types whose output depends only on their data and their inputs. typeform is left out
+# because new form responses change its output, pdfGenerator because it writes a file, and
+# linkedIn because its profile cache already decides, with its own TTL, how stale a profile may be.
+MEMOIZABLE_TYPES = {"cultureFit", "combineText", "askAI"}
+
+# Presentation-only fields that do not change what a node computes.
+IGNORED_FIELDS = {"label"}
+
+# Bumped whenever the stored entry format changes, so older entries are never misread.
+ENTRY_FORMAT = "3"
+
+
+class NodeMemo:
+    """Per-run view of the node output cache used by incremental runs.
+
+    A node's entry is keyed by its type, its data and the digests of its parents' outputs,
+    so editing one node only invalidates that node and the nodes downstream of it.
+    """
+
+    def __init__(self, cache: Optional[TieredCache] = None):
+        self.cache = cache or get_cache("node")
+        self.hits: List[str] = []
+        self._digests: Dict[str, str] = {}
+
+    def applies_to(self, node: Node) -> bool:
+        if node.type not in MEMOIZABLE_TYPES:
+            return False
+        # Respect the per-node opt-out used by the askAI cache.
+        return getattr(node.data, "useCache", True) is not False
+
+    def digest(self, node_id: str, outputs: dict) -> str:
+        digest = self._digests.get(node_id)
+        if digest is None:
+            digest = hashlib.sha256(NodeOutput.of(outputs[node_id]).text.encode("utf-8")).hexdigest()
+            self._digests[node_id] = digest
+        return digest
+
+    def key(self, node: Node, parent_ids: List[str], outputs: dict) -> Optional[str]:
+        """Cache key for a node about to run, or None when the node is not memoizable."""
+        if not self.applies_to(node):
+            return None
+        data = json.dumps(node.data.model_dump(exclude=IGNORED_FIELDS), sort_keys=True, default=str)
+        parent_digests = [self.digest(parent_id, outputs) for parent_id in parent_ids]
+        return make_key(ENTRY_FORMAT, node.type, data, *parent_digests)
+
+    async def get(self, node_id: str, key: str) -> Optional[NodeOutput]:
+        entry = await self.cache.get(key)
+        if entry is None:
+            return None
+        self.hits.append(node_id)
+        # Entries are "<media type>\n<meta JSON>\n<text>" so structured outputs stay structured
+        # and keep their meta (e.g. askAI's prompt report) on replay.
+        media_type, _, rest = entry.partition("\n")
+        meta, _, text = rest.partition("\n")
+        return NodeOutput(text=text, media_type=media_type, meta=json.loads(meta))
+
+    async def set(self, key: str, output: NodeOutput):
+        if not output.text.startswith(ERROR_PREFIXES):
+            meta = json.dumps(output.meta, separators=(",", ":"), default=str)
+            await self.cache.set(key, f"{output.media_type}\n{meta}\n{output.text}")
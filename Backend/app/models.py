@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import Annotated, List, Dict, Any, Optional
 from fastapi.encoders import jsonable_encoder
 
 class NodeData(BaseModel):
@@ -15,12 +15,17 @@ class NodeData(BaseModel):
     class Config:
         arbitrary_types_allowed = True
         extra = "allow"  
+        # Shared by concurrent runs once validated; per-run values go in the RunContext.
+        frozen = True
         
 
 class Node(BaseModel):
+    model_config = {"frozen": True}
+
     id: str
     type: str
-    position: Dict[str, float]
+    # Only used by the editor; not stored with saved workflows.
+    position: Optional[Dict[str, float]] = None
     data: NodeData
 
 class Edge(BaseModel):
@@ -32,4 +37,24 @@ class Edge(BaseModel):
 
 class Workflow(BaseModel):
     nodes: List[Node]
-    edges: List[Edge]
\ No newline at end of file
+    edges: List[Edge]
+    # Seconds the whole run may take; defaults to WORKFLOW_TIMEOUT_SECONDS.
+    timeout: Optional[float] = Field(default=None, gt=0)
+
+class WorkflowRunRequest(BaseModel):
+    # Node id -> node data fields to override for this run of a saved workflow.
+    overrides: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    timeout: Optional[float] = Field(default=None, gt=0)
+
+class BatchWorkflowRequest(BaseModel):
+    workflow: Workflow
+    # One entry per candidate: node id -> node data fields to override for that candidate.
+    candidates: List[Dict[str, Dict[str, Any]]]
+    concurrency: Optional[int] = Field(default=None, ge=1)
+
+class RankRequest(BaseModel):
+    # Trait -> weight; traits left out do not count. Defaults to cultureFit's default weights.
+    weights: Dict[str, Annotated[float, Field(ge=0)]] = Field(default_factory=dict)
+    k: int = Field(default=10, ge=1, le=1000)
+    # Least share of the total weight a candidate must have been scored on to be ranked.
+    min_coverage: float = Field(default=0.0, ge=0, le=1)
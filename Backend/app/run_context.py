@@ -0,0 +1,32 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping, Tuple
+from app.models import Node
+from app.utils.http_clients import HTTPClients
+from app.utils.node_output import NodeOutput
+
+
+@dataclass(frozen=True)
+class RunContext:
+    """What one handler call gets: the node's settings for this run, its inputs and the clients.
+
+    Built fresh for every node of every run, so node definitions stay untouched and a compiled
+    plan can be shared by any number of concurrent runs.
+    """
+
+    node_id: str
+    node_type: str
+    # The node's data, plus anything the executor resolved for this run (e.g. askAI's context).
+    config: Mapping[str, Any]
+    # Parent outputs in edge order.
+    inputs: Tuple[NodeOutput, ...] = ()
+    clients: HTTPClients = field(default=None, repr=False)
+
+    @classmethod
+    def for_node(cls, node: Node, inputs=(), clients: HTTPClients = None, **resolved: Any) -> "RunContext":
+        config = {**node.data.__dict__, **(node.data.__pydantic_extra__ or {}), **resolved}
+        return cls(node.id, node.type, MappingProxyType(config), tuple(inputs), clients)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """A setting by name, or ``default`` when the node data does not have it."""
+        return self.config.get(name, default)
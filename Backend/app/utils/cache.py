@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+CACHE_DIR = os.environ.get("CACHE_DIR", "cache")
+
+
+def make_key(*parts: str) -> str:
+    """Content-address a cache entry by hashing its parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class MemoryTier:
+    """Bounded in-process LRU tier."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Tuple[str, float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """Persistent tier backed by a single SQLite file; queries run in a worker thread."""
+
+    name = "sqlite"
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._writes = 0
+
+    def _get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return row[0], row[1]
+
+    def _set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[Tuple[str, float]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str, expires_at: float):
+        await asyncio.to_thread(self._set, key, value, expires_at)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete, key)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """Read-through cache over an ordered list of tiers (fastest first).
+
+    A hit in a slower tier is copied into the faster ones with its original expiry.
+    Tiers only need async ``get`` (returning ``(value, expires_at)``), ``set`` and
+    ``delete`` methods, so other backends can be plugged in.
+    """
+
+    def __init__(self, name: str, tiers: List, ttl: float):
+        self.name = name
+        self.tiers = tiers
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.tier_hits = {tier.name: 0 for tier in tiers}
+
+    async def get(self, key: str) -> Optional[str]:
+        for index, tier in enumerate(self.tiers):
+            entry = await tier.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                self.hits += 1
+                self.tier_hits[tier.name] += 1
+                for faster in self.tiers[:index]:
+                    await faster.set(key, value, expires_at)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        for tier in self.tiers:
+            await tier.set(key, value, expires_at)
+
+    async def delete(self, key: str):
+        for tier in self.tiers:
+            await tier.delete(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "tier_hits": dict(self.tier_hits),
+            "ttl": self.ttl,
+        }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight task."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        # Shielded so one caller going away does not cancel the call for the others.
+        return await asyncio.shield(future)
+
+
+_caches: Dict[str, TieredCache] = {}
+
+
+def get_cache(name: str, default_ttl: float = 24 * 3600, default_max_entries: int = 1024) -> TieredCache:
+    """Return the named app-wide cache, configured from <NAME>_CACHE_* environment variables.
+
+    ``<NAME>_CACHE_TTL`` (seconds), ``<NAME>_CACHE_MAX_ENTRIES`` (memory tier size) and
+    ``<NAME>_CACHE_DISK=0`` to keep the cache in memory only.
+    """
+    cache = _caches.get(name)
+    if cache is None:
+        prefix = f"{name.upper()}_CACHE"
+        ttl = float(os.environ.get(f"{prefix}_TTL", default_ttl))
+        max_entries = int(os.environ.get(f"{prefix}_MAX_ENTRIES", default_max_entries))
+        tiers = [MemoryTier(max_entries)]
+        if os.environ.get(f"{prefix}_DISK", "1").lower() not in ("0", "false", "no"):
+            tiers.append(SQLiteTier(os.path.join(CACHE_DIR, f"{name}.sqlite3")))
+        cache = TieredCache(name, tiers, ttl)
+        _caches[name] = cache
+    return cache
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def close_caches():
+    for cache in _caches.values():
+        for tier in cache.tiers:
+            if hasattr(tier, "close"):
+                tier.close()
+    _caches.clear()
+
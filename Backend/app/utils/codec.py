@@ -0,0 +1,164 @@
+"""Request and response encodings for the workflow endpoints.
+
+Bodies are JSON, or MessagePack when sent as ``application/msgpack``; JSON is validated
+straight from the raw bytes by pydantic. Responses are encoded with orjson, or MessagePack
+when the client's Accept header prefers it, without going through jsonable_encoder.
+Large responses are compressed with brotli when it is installed and accepted, else gzip.
+Since decoded_body reads the body itself, endpoints document it with ``request_body``.
+"""
+import asyncio
+import gzip
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Type, TypeVar
+import msgpack
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from app.utils.node_output import NodeOutput
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = {MSGPACK, "application/x-msgpack", "application/vnd.msgpack"}
+
+# Responses smaller than this are sent uncompressed.
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+
+Model = TypeVar("Model", bound=BaseModel)
+
+SCHEMA_REF = "#/components/schemas/{model}"
+# Schemas of the models named by request_body, added to the OpenAPI components by document_bodies.
+_body_schemas: Dict[str, dict] = {}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, NodeOutput):
+        # JSON that only exists as text (a cached profile, a memoized node) is embedded as is
+        # rather than parsed and encoded again.
+        if value.is_json and not value.has_value:
+            return orjson.Fragment(value.text)
+        return value.jsonable()
+    return str(value)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, NodeOutput):
+        return value.jsonable()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _media_type(value: Optional[str]) -> str:
+    return (value or "").split(";", 1)[0].strip().lower()
+
+
+def _preferences(header: str) -> dict:
+    """Media types or encodings from an Accept-style header with their q-values."""
+    preferences = {}
+    for part in header.split(","):
+        name, *params = (item.strip() for item in part.split(";"))
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        preferences[name.lower()] = max(q, preferences.get(name.lower(), 0.0))
+    return preferences
+
+
+def wants_msgpack(request: Request) -> bool:
+    """Whether the client asked for MessagePack at least as strongly as for JSON."""
+    accept = _preferences(request.headers.get("accept", ""))
+    msgpack_q = max((accept.get(media_type, 0.0) for media_type in MSGPACK_TYPES), default=0.0)
+    return msgpack_q > 0 and msgpack_q >= accept.get(JSON, 0.0)
+
+
+def _content_encoding(request: Request) -> Optional[str]:
+    accepted = _preferences(request.headers.get("accept-encoding", ""))
+    if BROTLI_AVAILABLE and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+async def encoded_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """Encode content as JSON or MessagePack for this client, compressing large bodies."""
+    if wants_msgpack(request):
+        body, media_type = msgpack.packb(content, default=_msgpack_default), MSGPACK
+    else:
+        body, media_type = dumps(content), JSON
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = _content_encoding(request) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding is not None:
+        body = await asyncio.to_thread(_compress, body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def decoded_body(model: Type[Model]) -> Callable[[Request], Awaitable[Model]]:
+    """A dependency validating the request body as model, from JSON bytes or MessagePack.
+
+    Validation errors are reported like FastAPI's own body validation, as a 422.
+    """
+    async def parse(request: Request) -> Model:
+        body = await request.body()
+        try:
+            if _media_type(request.headers.get("content-type")) in MSGPACK_TYPES:
+                try:
+                    data = msgpack.unpackb(body)
+                except (ValueError, msgpack.UnpackException):
+                    raise HTTPException(status_code=400, detail="Invalid MessagePack body.")
+                return model.model_validate(data)
+            return model.model_validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+
+    return parse
+
+
+def request_body(model: Type[BaseModel]) -> dict:
+    """``openapi_extra`` documenting model as the JSON or MessagePack body of an endpoint."""
+    schema = model.model_json_schema(ref_template=SCHEMA_REF)
+    _body_schemas.update(schema.pop("$defs", {}))
+    _body_schemas[model.__name__] = schema
+    ref = {"$ref": SCHEMA_REF.format(model=model.__name__)}
+    return {"requestBody": {"required": True, "content": {JSON: {"schema": ref}, MSGPACK: {"schema": ref}}}}
+
+
+def document_bodies(app: FastAPI):
+    """Add the schemas request_body refers to to the app's OpenAPI components."""
+    generate = app.openapi
+
+    def openapi() -> dict:
+        schema = generate()
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        for name, body in _body_schemas.items():
+            components.setdefault(name, body)
+        return schema
+
+    app.openapi = openapi
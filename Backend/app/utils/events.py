@@ -0,0 +1,12 @@
+import orjson
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+# Set by the executor while a node runs on a streaming request; handlers that
+# produce incremental output (AskAI) pass each chunk of text to it.
+token_sink: ContextVar[Optional[Callable[[str], None]]] = ContextVar("token_sink", default=None)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Events message."""
+    return f"event: {event}\ndata: {orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()}\n\n"
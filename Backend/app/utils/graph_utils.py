@@ -1,5 +1,7 @@
-from typing import List
-from app.models import Node, Edge
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Set
+from app.models import Node, Edge, Workflow
 
 def get_start_nodes(nodes: List[Node], edges: List[Edge]) -> List[Node]:
     """Return nodes that are not targets of any edge."""
@@ -8,5 +10,246 @@ def get_start_nodes(nodes: List[Node], edges: List[Edge]) -> List[Node]:
 
 def get_outgoers(node_id: str, edges: List[Edge]) -> List[str]:
     """Return the list of node IDs that are children of the given node_id."""
-    return [edge.target for edge in edges if edge.source == node_id] 
+    return [edge.target for edge in edges if edge.source == node_id]
 
+
+class WorkflowGraphError(ValueError):
+    """Raised when a workflow graph cannot be compiled into an execution plan."""
+
+
+# Node types run by the engine itself rather than by a handler. A map node runs the nodes
+# between it and its reduce node (its body) once per item of its input list.
+MAP = "map"
+REDUCE = "reduce"
+FLOW_TYPES = {MAP, REDUCE}
+
+
+@dataclass
+class MapRegion:
+    """A map node's body, the reduce node collecting its results and the plan to run it per item.
+
+    ``inputs`` are the nodes outside the region that body nodes read from; ``plan`` holds
+    the body together with the map node and those inputs, to be run with ``only=body``.
+    """
+    map_id: str
+    reduce_id: str
+    body: List[str]
+    inputs: List[str]
+    plan: "ExecutionPlan"
+
+
+@dataclass
+class ExecutionPlan:
+    """Adjacency-indexed view of a workflow, compiled once per run.
+
+    ``parents`` and ``children`` keep one entry per edge, in edge order, so
+    handlers see their inputs in the same order the edges were drawn.
+    ``in_degree`` counts incoming edges and ``order`` is a topological order.
+    ``timeout`` is the workflow's own deadline in seconds, if it set one.
+
+    ``regions`` maps each map node to its MapRegion, and ``mapped_by`` and ``reduced_by``
+    map body and reduce nodes back to their map node. ``run_parents`` and ``run_children``
+    are the dependencies the scheduler follows: a map node waits for its region's inputs,
+    its reduce node only for the map node, and body nodes are left to the map node. Without
+    map nodes they are ``parents`` and ``children``.
+    """
+    nodes: Dict[str, Node]
+    parents: Dict[str, List[str]]
+    children: Dict[str, List[str]]
+    in_degree: Dict[str, int]
+    order: List[str]
+    timeout: Optional[float] = None
+    regions: Dict[str, MapRegion] = field(default_factory=dict)
+    mapped_by: Dict[str, str] = field(default_factory=dict)
+    reduced_by: Dict[str, str] = field(default_factory=dict)
+    run_parents: Optional[Dict[str, List[str]]] = None
+    run_children: Optional[Dict[str, List[str]]] = None
+
+    def __post_init__(self):
+        if self.run_parents is None:
+            self.run_parents = self.parents
+        if self.run_children is None:
+            self.run_children = self.children
+
+    @property
+    def start_ids(self) -> List[str]:
+        return [node_id for node_id in self.order if self.in_degree[node_id] == 0]
+
+    def with_nodes(self, nodes: Dict[str, Node]) -> "ExecutionPlan":
+        """Return a plan sharing this graph's indexes with some node definitions swapped out."""
+        return replace(self, nodes={**self.nodes, **nodes})
+
+    def descendants(self, node_ids: Iterable[str]) -> Set[str]:
+        """Return the given nodes together with everything downstream of them.
+
+        Reaching a map node's body or reduce node also reaches the map node, which is what
+        produces their results.
+        """
+        seen = set()
+        stack = list(node_ids)
+        while stack:
+            node_id = stack.pop()
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            stack.extend(self.children[node_id])
+            owner = self.mapped_by.get(node_id) or self.reduced_by.get(node_id)
+            if owner is not None:
+                stack.append(owner)
+        return seen
+
+    def ancestors(self, node_ids: Iterable[str]) -> Set[str]:
+        """Return the given nodes together with everything upstream of them."""
+        seen = set()
+        stack = list(node_ids)
+        while stack:
+            node_id = stack.pop()
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            stack.extend(self.parents[node_id])
+        return seen
+
+
+def compile_workflow(workflow: Workflow) -> ExecutionPlan:
+    """Index the workflow's edges and check that it forms a DAG."""
+    nodes = {}
+    for node in workflow.nodes:
+        if node.id in nodes:
+            raise WorkflowGraphError(f"Duplicate node id: {node.id}")
+        nodes[node.id] = node
+
+    parents = {node_id: [] for node_id in nodes}
+    children = {node_id: [] for node_id in nodes}
+    in_degree = {node_id: 0 for node_id in nodes}
+
+    for edge in workflow.edges:
+        for endpoint in (edge.source, edge.target):
+            if endpoint not in nodes:
+                raise WorkflowGraphError(f"Edge references unknown node: {endpoint}")
+        parents[edge.target].append(edge.source)
+        children[edge.source].append(edge.target)
+        in_degree[edge.target] += 1
+
+    remaining = dict(in_degree)
+    ready = deque(node_id for node_id in nodes if remaining[node_id] == 0)
+    order = []
+    while ready:
+        node_id = ready.popleft()
+        order.append(node_id)
+        for child_id in children[node_id]:
+            remaining[child_id] -= 1
+            if remaining[child_id] == 0:
+                ready.append(child_id)
+
+    if len(order) != len(nodes):
+        cyclic = [node_id for node_id in nodes if remaining[node_id] > 0]
+        raise WorkflowGraphError(f"Circular dependency detected for nodes: {', '.join(cyclic)}")
+
+    plan = ExecutionPlan(
+        nodes=nodes,
+        parents=parents,
+        children=children,
+        in_degree=in_degree,
+        order=order,
+        timeout=workflow.timeout,
+    )
+    if any(node.type in FLOW_TYPES for node in nodes.values()):
+        _compile_regions(plan)
+    return plan
+
+
+def _subplan(plan: ExecutionPlan, node_ids: Set[str]) -> ExecutionPlan:
+    """The plan restricted to node_ids, with no deadline of its own."""
+    parents = {node_id: [p for p in plan.parents[node_id] if p in node_ids] for node_id in node_ids}
+    children = {node_id: [c for c in plan.children[node_id] if c in node_ids] for node_id in node_ids}
+    return ExecutionPlan(
+        nodes={node_id: plan.nodes[node_id] for node_id in node_ids},
+        parents=parents,
+        children=children,
+        in_degree={node_id: len(parents[node_id]) for node_id in node_ids},
+        order=[node_id for node_id in plan.order if node_id in node_ids],
+        timeout=0,
+    )
+
+
+def _compile_regions(plan: ExecutionPlan):
+    """Find each map node's body and reduce node and derive the scheduler's dependencies."""
+    run_parents = {node_id: list(parent_ids) for node_id, parent_ids in plan.parents.items()}
+    run_children = {node_id: list(child_ids) for node_id, child_ids in plan.children.items()}
+
+    for map_id in plan.order:
+        if plan.nodes[map_id].type != MAP:
+            continue
+        if len(plan.parents[map_id]) > 1:
+            raise WorkflowGraphError(f"Map node {map_id} takes at most one input.")
+        concurrency = getattr(plan.nodes[map_id].data, "concurrency", None)
+        if concurrency is not None and (type(concurrency) is not int or concurrency < 1):
+            raise WorkflowGraphError(f"Map node {map_id} concurrency must be a positive integer, got {concurrency!r}.")
+        downstream = plan.descendants(plan.children[map_id]) - {map_id}
+        reduce_id = next((node_id for node_id in plan.order if node_id in downstream and plan.nodes[node_id].type == REDUCE), None)
+        if reduce_id is None:
+            raise WorkflowGraphError(f"Map node {map_id} has no reduce node downstream.")
+        if reduce_id in plan.reduced_by:
+            raise WorkflowGraphError(f"Reduce node {reduce_id} is shared by map nodes {plan.reduced_by[reduce_id]} and {map_id}.")
+        plan.reduced_by[reduce_id] = map_id
+
+        body = plan.ancestors(plan.parents[reduce_id]) & downstream
+        for node_id in plan.children[map_id]:
+            if node_id != reduce_id and node_id not in body:
+                raise WorkflowGraphError(f"Every branch of map node {map_id} must end in reduce node {reduce_id}.")
+        for node_id in body:
+            if plan.nodes[node_id].type in FLOW_TYPES:
+                raise WorkflowGraphError(f"Map node {map_id} contains {plan.nodes[node_id].type} node {node_id}; nested maps are not supported.")
+            if any(child_id != reduce_id and child_id not in body for child_id in plan.children[node_id]):
+                raise WorkflowGraphError(f"Node {node_id} inside map node {map_id} feeds nodes outside it; route them through {reduce_id}.")
+            plan.mapped_by[node_id] = map_id
+        if any(parent_id != map_id and parent_id not in body for parent_id in plan.parents[reduce_id]):
+            raise WorkflowGraphError(f"Reduce node {reduce_id} may only take inputs from inside map node {map_id}.")
+
+        inputs = []
+        for node_id in plan.order:
+            if node_id in body:
+                for parent_id in plan.parents[node_id]:
+                    if parent_id != map_id and parent_id not in body and parent_id not in inputs:
+                        inputs.append(parent_id)
+        region_ids = body | {map_id} | set(inputs)
+        plan.regions[map_id] = MapRegion(
+            map_id=map_id,
+            reduce_id=reduce_id,
+            body=[node_id for node_id in plan.order if node_id in body],
+            inputs=inputs,
+            plan=_subplan(plan, region_ids),
+        )
+
+        # The scheduler runs map -> reduce, with the body's outside inputs feeding the map node.
+        for parent_id in inputs:
+            run_children[parent_id] = [c for c in run_children[parent_id] if c not in body]
+            if map_id not in run_children[parent_id]:
+                run_children[parent_id].append(map_id)
+                run_parents[map_id].append(parent_id)
+        run_children[map_id] = [reduce_id]
+        run_parents[reduce_id] = [map_id]
+        for node_id in body:
+            run_parents[node_id] = []
+            run_children[node_id] = []
+
+    for node_id in plan.order:
+        if plan.nodes[node_id].type == REDUCE and node_id not in plan.reduced_by:
+            raise WorkflowGraphError(f"Reduce node {node_id} has no map node upstream.")
+
+    # A body input downstream of a region's results would make a map node wait for itself.
+    scheduled = [node_id for node_id in plan.order if node_id not in plan.mapped_by]
+    waiting = {node_id: len(run_parents[node_id]) for node_id in scheduled}
+    ready = deque(node_id for node_id in scheduled if waiting[node_id] == 0)
+    while ready:
+        for child_id in run_children[ready.popleft()]:
+            waiting[child_id] -= 1
+            if waiting[child_id] == 0:
+                ready.append(child_id)
+    looped = [node_id for node_id in scheduled if waiting[node_id] > 0]
+    if looped:
+        raise WorkflowGraphError(f"Map nodes depend on their own results through nodes: {', '.join(looped)}")
+
+    plan.run_parents = run_parents
+    plan.run_children = run_children
@@ -0,0 +1,106 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict
+import httpx
+from app.utils.metrics import UPSTREAM_LATENCY_SECONDS, UPSTREAM_REQUEST_BYTES
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class UpstreamConfig:
+    """Connection pool and timeout settings for one upstream host."""
+    max_connections: int = 50
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 10.0
+    pool_timeout: float = 10.0
+    http2: bool = True
+
+    @classmethod
+    def from_env(cls, name: str, **defaults) -> "UpstreamConfig":
+        """Build a config from HTTP_* variables, with HTTP_<NAME>_* overrides per upstream."""
+        config = cls(**defaults)
+        for field, cast in (
+            ("max_connections", int),
+            ("max_keepalive_connections", int),
+            ("keepalive_expiry", float),
+            ("connect_timeout", float),
+            ("read_timeout", float),
+            ("write_timeout", float),
+            ("pool_timeout", float),
+        ):
+            for key in (f"HTTP_{name.upper()}_{field.upper()}", f"HTTP_{field.upper()}"):
+                value = os.environ.get(key)
+                if value:
+                    setattr(config, field, cast(value))
+                    break
+        http2 = os.environ.get(f"HTTP_{name.upper()}_HTTP2", os.environ.get("HTTP_HTTP2"))
+        if http2:
+            config.http2 = http2.lower() in ("1", "true", "yes")
+        return config
+
+
+# OpenRouter completions routinely run for tens of seconds, so it gets a longer read timeout.
+UPSTREAM_DEFAULTS = {
+    "openrouter": {"read_timeout": 180.0},
+    "relevance": {"read_timeout": 60.0},
+    "typeform": {},
+}
+
+
+class HTTPClients:
+    """App-scoped registry of pooled AsyncClients, one per upstream host."""
+
+    def __init__(self, configs: Dict[str, UpstreamConfig]):
+        self._configs = configs
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    @classmethod
+    def from_env(cls) -> "HTTPClients":
+        return cls({name: UpstreamConfig.from_env(name, **defaults) for name, defaults in UPSTREAM_DEFAULTS.items()})
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None:
+            client = self._create(name, self._configs.get(name) or UpstreamConfig.from_env(name))
+            self._clients[name] = client
+        return client
+
+    def _create(self, name: str, config: UpstreamConfig) -> httpx.AsyncClient:
+        async def on_request(request: httpx.Request):
+            request.extensions["started_at"] = time.perf_counter()
+            UPSTREAM_REQUEST_BYTES.inc(name, amount=int(request.headers.get("Content-Length", 0)))
+
+        async def on_response(response: httpx.Response):
+            started_at = response.request.extensions.get("started_at")
+            if started_at is not None:
+                UPSTREAM_LATENCY_SECONDS.observe(time.perf_counter() - started_at, name, str(response.status_code))
+
+        return httpx.AsyncClient(
+            event_hooks={"request": [on_request], "response": [on_response]},
+            http2=config.http2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=config.connect_timeout,
+                read=config.read_timeout,
+                write=config.write_timeout,
+                pool=config.pool_timeout,
+            ),
+        )
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
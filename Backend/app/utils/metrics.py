@@ -0,0 +1,106 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            # Per series: one non-cumulative count per bucket, then +Inf, then sum.
+            series = self._series.setdefault(label_values, [0.0] * (len(self.buckets) + 2))
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {series[-1]}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+NODE_QUEUE_SECONDS = Histogram(
+    "workflow_node_queue_seconds", "Time from a node becoming ready to its handler starting.", ["node_type"]
+)
+NODE_DURATION_SECONDS = Histogram(
+    "workflow_node_duration_seconds", "Node handler run time.", ["node_type", "status"]
+)
+NODE_OUTPUT_BYTES = Histogram(
+    "workflow_node_output_bytes", "Size of node outputs.", ["node_type"], buckets=SIZE_BUCKETS
+)
+WORKFLOW_DURATION_SECONDS = Histogram(
+    "workflow_run_duration_seconds", "Whole workflow run time.", ["endpoint", "status"]
+)
+UPSTREAM_LATENCY_SECONDS = Histogram(
+    "upstream_request_seconds", "Time from sending an upstream request to receiving its response headers.",
+    ["upstream", "status_code"],
+)
+UPSTREAM_REQUEST_BYTES = Counter(
+    "upstream_request_bytes_total", "Bytes sent in upstream request bodies.", ["upstream"]
+)
+
+REGISTRY = [
+    NODE_QUEUE_SECONDS,
+    NODE_DURATION_SECONDS,
+    NODE_OUTPUT_BYTES,
+    WORKFLOW_DURATION_SECONDS,
+    UPSTREAM_LATENCY_SECONDS,
+    UPSTREAM_REQUEST_BYTES,
+]
+
+
+def render_prometheus() -> str:
+    """Render every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,125 @@
+import json
+from typing import Any, Dict, Optional
+
+JSON = "application/json"
+TEXT = "text/plain"
+
+# Handlers report failures as text starting with one of these. Such outputs are never cached
+# or memoized, and askAI does not count them as completions.
+ERROR_PREFIXES = (
+    "Error:",
+    "Error combining text:",
+    "Error in CultureFitNode:",
+    "Error fetching Typeform responses:",
+    "Error generating PDF:",
+    "Error processing",
+    "Error storing scores:",
+    "API Error:",
+    "Unexpected error with",
+    "Invalid model selected.",
+    "No input data provided",
+)
+
+_MISSING = object()
+
+
+class NodeOutput:
+    """What a node hands to its children: a parsed value, text or bytes, converted only on demand.
+
+    Producers keep whatever form they already have (a dict from an API, text from an LLM) and
+    each other form is derived once, on first use, then reused by every consumer. JSON values
+    render as ``json.dumps(value, indent=2)``, the text form nodes have always exchanged.
+    Forms given together are kept as is, e.g. a PDF's bytes with a short text summary.
+    """
+
+    __slots__ = ("_value", "_text", "_data", "media_type", "meta")
+
+    def __init__(
+        self,
+        value: Any = _MISSING,
+        text: Optional[str] = None,
+        data: Optional[bytes] = None,
+        media_type: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ):
+        if value is _MISSING and text is None and data is None:
+            raise ValueError("NodeOutput needs a value, text or data")
+        self._value = value
+        self._text = text
+        self._data = data
+        if media_type is None:
+            media_type = JSON if isinstance(value, (dict, list)) else TEXT
+        self.media_type = media_type
+        self.meta = meta or {}
+
+    @classmethod
+    def of(cls, result: Any) -> "NodeOutput":
+        """Wrap a handler's return value; strings stay text, dicts and lists stay structured."""
+        if isinstance(result, NodeOutput):
+            return result
+        if isinstance(result, str):
+            return cls(text=result)
+        if isinstance(result, bytes):
+            return cls(data=result, media_type="application/octet-stream")
+        return cls(value=result)
+
+    @property
+    def is_json(self) -> bool:
+        return self.media_type == JSON
+
+    @property
+    def has_value(self) -> bool:
+        """Whether the structured value is at hand without parsing the text."""
+        return self._value is not _MISSING
+
+    @property
+    def value(self) -> Any:
+        """The structured value; JSON text is parsed on first access, plain text is returned as is."""
+        if self._value is _MISSING:
+            self._value = json.loads(self.text) if self.is_json else self.text
+        return self._value
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            if self._value is not _MISSING:
+                self._text = self._value if isinstance(self._value, str) else json.dumps(
+                    self._value, indent=2, default=str
+                )
+            else:
+                self._text = self._data.decode("utf-8", errors="replace")
+        return self._text
+
+    @property
+    def data(self) -> bytes:
+        if self._data is None:
+            self._data = self.text.encode("utf-8")
+        return self._data
+
+    def jsonable(self) -> Any:
+        """The form embedded in a structured HTTP response: values for JSON, text otherwise."""
+        return self.value if self.is_json else self.text
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"NodeOutput(media_type={self.media_type!r}, meta={self.meta!r})"
+
+
+def render_outputs(outputs: Dict[str, Any], structured: bool = False, raw: bool = False) -> Dict[str, Any]:
+    """Turn a run's outputs into response data: text per node, or parsed values when ``structured``.
+
+    With ``raw`` structured JSON outputs stay NodeOutputs, for encoders that can embed their
+    text without parsing it (see app.utils.codec).
+    """
+    rendered = {}
+    for node_id, output in outputs.items():
+        output = NodeOutput.of(output)
+        if not structured:
+            rendered[node_id] = output.text
+        elif raw and output.is_json:
+            rendered[node_id] = output
+        else:
+            rendered[node_id] = output.jsonable()
+    return rendered
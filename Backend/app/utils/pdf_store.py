@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Optional
+
+PDF_STORE_DIR = os.environ.get("PDF_STORE_DIR", "generated_pdfs")
+
+# Only names the store hands out are served, which also keeps paths inside the directory.
+FILENAME_PATTERN = re.compile(r"^generated_[0-9a-f]{32}\.pdf$")
+
+
+class PDFStore:
+    """Content-addressed directory of kept reports, bounded by total size and file age.
+
+    Identical reports share one file. Every write evicts files older than ``max_age`` and
+    then the least recently written ones until the directory fits in ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.evicted = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def filename_for(data: bytes) -> str:
+        return f"generated_{hashlib.sha256(data).hexdigest()[:32]}.pdf"
+
+    def _put(self, data: bytes) -> str:
+        filename = self.filename_for(data)
+        path = os.path.join(self.directory, filename)
+        with self._lock:
+            if os.path.exists(path):
+                # Same report again: refresh its age instead of writing a second copy.
+                os.utime(path)
+            else:
+                temp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            self._evict()
+        return filename
+
+    def _evict(self):
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not entry.name.endswith(".pdf"):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime > self.max_age:
+                self._remove(entry.path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+            self.evicted += 1
+        except FileNotFoundError:
+            pass
+
+    async def put(self, data: bytes) -> str:
+        """Keep a rendered report and return the filename it can be downloaded under."""
+        return await asyncio.to_thread(self._put, data)
+
+    async def evict(self):
+        def run():
+            with self._lock:
+                self._evict()
+
+        await asyncio.to_thread(run)
+
+    def path(self, filename: str) -> Optional[str]:
+        """Path of a kept report, or None if the name is unknown, evicted or expired."""
+        if not FILENAME_PATTERN.match(filename):
+            return None
+        path = os.path.join(self.directory, filename)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+        except OSError:
+            return None
+        return path
+
+    def stats(self) -> dict:
+        files = [entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(".pdf")]
+        return {
+            "files": len(files),
+            "bytes": sum(files),
+            "max_bytes": self.max_bytes,
+            "max_age": self.max_age,
+            "evicted": self.evicted,
+        }
+
+
+_store: Optional[PDFStore] = None
+
+
+def get_pdf_store() -> PDFStore:
+    """Return the app-wide store, configured from PDF_STORE_* environment variables."""
+    global _store
+    if _store is None:
+        _store = PDFStore(
+            PDF_STORE_DIR,
+            max_bytes=int(os.environ.get("PDF_STORE_MAX_BYTES", str(512 * 2 ** 20))),
+            max_age=float(os.environ.get("PDF_STORE_MAX_AGE", str(7 * 24 * 3600))),
+        )
+    return _store
@@ -0,0 +1,130 @@
+"""Fitting a node's inputs into an LLM prompt of bounded size.
+
+Token counts are estimated locally from character counts; the estimate errs on the high
+side for prose and is close for compact JSON, which is all the budget needs.
+"""
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.utils.node_output import NodeOutput
+
+CHARS_PER_TOKEN = 3.5
+
+# Fields of structured inputs (LinkedIn profiles, Typeform answers) that carry nothing an
+# evaluation can use and only cost tokens.
+IRRELEVANT_FIELDS = {"email", "profile_image_url", "logo_url", "company_logo_url", "urn", "profile_id"}
+
+# Caps applied in turn to every list in structured inputs (e.g. experiences, educations)
+# before any text is cut. Lists keep their first items, which upstream orders newest first.
+LIST_LIMITS = (10, 5, 3, 1)
+
+TRUNCATION_MARKER = "\n[... truncated ...]"
+
+_EMPTY = (None, "", [], {})
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact(value: Any, list_limit: Optional[int] = None) -> Any:
+    """Drop empty and irrelevant fields, strip strings and cap list lengths."""
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            if key in IRRELEVANT_FIELDS:
+                continue
+            item = compact(item, list_limit)
+            if item not in _EMPTY:
+                compacted[key] = item
+        return compacted
+    if isinstance(value, list):
+        items = (compact(item, list_limit) for item in value[:list_limit])
+        return [item for item in items if item not in _EMPTY]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def render_input(output: NodeOutput, list_limit: Optional[int] = None) -> str:
+    """An input as prompt text: structured values as compact JSON, text as is."""
+    if output.is_json:
+        return json.dumps(compact(output.value, list_limit), separators=(",", ":"), ensure_ascii=False, default=str)
+    return output.text.strip()
+
+
+def truncate(text: str, tokens: int) -> str:
+    if estimate_tokens(text) <= tokens:
+        return text
+    keep = max(int(tokens * CHARS_PER_TOKEN) - len(TRUNCATION_MARKER), 0)
+    return text[:keep].rstrip() + TRUNCATION_MARKER
+
+
+def fair_shares(sizes: Sequence[int], budget: int) -> List[int]:
+    """Split budget so inputs under an equal share keep all they need and the rest share what is left."""
+    shares = list(sizes)
+    pending = sorted(range(len(sizes)), key=lambda index: sizes[index])
+    left = budget
+    while pending:
+        share = left // len(pending)
+        if sizes[pending[0]] > share:
+            for index in pending:
+                shares[index] = share
+            break
+        left -= sizes[pending.pop(0)]
+    return shares
+
+
+def build_prompt(
+    context: str, inputs: Sequence[NodeOutput], prompt: str, budget: Optional[int]
+) -> Tuple[str, Dict[str, Any]]:
+    """Assemble ``context``, the inputs and ``prompt`` into one prompt of at most ``budget`` tokens.
+
+    The context and the prompt itself are always kept whole. Inputs are compacted and
+    share what is left: short inputs keep everything and long ones get an equal share.
+    Structured inputs over their share first have their lists shortened step by step;
+    whatever is still over its share is then truncated. Returns the
+    prompt and a report of the estimated sizes; a budget of None or 0 only compacts.
+    """
+    texts = [render_input(output) for output in inputs]
+    # Reported sizes are of the compacted inputs; NodeOutput.text would render JSON indented.
+    original_sizes = [estimate_tokens(text) for text in texts]
+    available = None
+    list_limit = None
+    if budget:
+        available = max(budget - estimate_tokens(context) - estimate_tokens(prompt) - 2 * len(inputs) - 2, 0)
+        structured = [index for index, output in enumerate(inputs) if output.is_json]
+        for limit in LIST_LIMITS if structured else ():
+            sizes = [estimate_tokens(text) for text in texts]
+            shares = fair_shares(sizes, available)
+            if all(sizes[index] <= shares[index] for index in structured):
+                break
+            list_limit = limit
+            for index in structured:
+                texts[index] = render_input(inputs[index], limit)
+
+    sizes = [estimate_tokens(text) for text in texts]
+    truncated = set()
+    if available is not None and sum(sizes) > available:
+        for index, share in enumerate(fair_shares(sizes, available)):
+            if sizes[index] > share:
+                texts[index] = truncate(texts[index], share)
+                truncated.add(index)
+
+    combined_input = "".join(text + "\n\n" for text in texts)
+    final_prompt = f"{context}\n{combined_input}\n{prompt}"
+    report = {
+        "budget": budget or None,
+        "tokens": estimate_tokens(final_prompt),
+        "inputs": [
+            {
+                "original_tokens": original_tokens,
+                "tokens": estimate_tokens(text),
+                "truncated": index in truncated,
+            }
+            for index, (original_tokens, text) in enumerate(zip(original_sizes, texts))
+        ],
+    }
+    if list_limit is not None:
+        report["list_limit"] = list_limit
+    return final_prompt, report
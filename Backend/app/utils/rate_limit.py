@@ -0,0 +1,158 @@
+import asyncio
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+class UpstreamThrottled(Exception):
+    """Raised by a provider call that should be retried after backing off."""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ProviderLimiter:
+    """Token bucket plus concurrency cap for one upstream model.
+
+    The refill rate is halved whenever the provider answers 429 and creeps back
+    up by ``recovery_step`` after each success; a Retry-After pauses every caller.
+    429s arriving within ``decrease_interval`` of the last decrease are treated as
+    the same congestion event, so a burst of concurrent rejections halves once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        max_retries: int,
+        min_rate: float = 0.05,
+        recovery_step: float = 0.05,
+        decrease_interval: float = 1.0,
+    ):
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.recovery_step = recovery_step
+        self.decrease_interval = decrease_interval
+        self._last_decrease = float("-inf")
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self.waiting = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self._take_token()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self.waiting -= 1
+
+        wait = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        try:
+            yield wait
+        finally:
+            self._semaphore.release()
+
+    async def _take_token(self):
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        self.throttled += 1
+        now = time.monotonic()
+        if now - self._last_decrease >= self.decrease_interval:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._last_decrease = now
+        self._tokens = 0.0
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "max_rate": self.max_rate,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "avg_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+
+
+def get_limiter(name: str) -> ProviderLimiter:
+    """Return the limiter for an upstream model, configured from LLM_* environment variables."""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = ProviderLimiter(
+            name,
+            rate=float(os.environ.get("LLM_RATE_PER_SECOND", "0.5")),
+            burst=int(os.environ.get("LLM_BURST", "5")),
+            max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", "4")),
+            max_retries=int(os.environ.get("LLM_MAX_RETRIES", "4")),
+        )
+        _limiters[name] = limiter
+    return limiter
+
+
+def limiter_stats() -> dict:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
@@ -0,0 +1,182 @@
+"""Markdown-ish report text to PDF.
+
+``build_spec`` runs in the app process and turns the text into a compact, picklable list of
+``(kind, value)`` blocks in one regex pass. ``render_pdf`` runs in a PDF worker process and
+turns the blocks into flowables using styles built once, when the module is imported.
+"""
+import io
+import re
+from typing import Any, List, Tuple
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+Spec = List[Tuple[str, Any]]
+
+STYLES = {
+    "title": ParagraphStyle(
+        name="TitleStyle",
+        fontSize=16,
+        leading=20,
+        alignment=1,
+        spaceAfter=12,
+        fontName="Helvetica-Bold",
+        textColor=colors.darkblue,
+    ),
+    "heading": ParagraphStyle(
+        name="HeadingStyle",
+        fontSize=14,
+        leading=16,
+        spaceBefore=12,
+        spaceAfter=6,
+        fontName="Helvetica-Bold",
+        textColor=colors.darkblue,
+    ),
+    "subheading": ParagraphStyle(
+        name="SubheadingStyle",
+        fontSize=12,
+        leading=14,
+        spaceBefore=10,
+        spaceAfter=4,
+        fontName="Helvetica-Bold",
+        textColor=colors.darkblue,
+    ),
+    "body": ParagraphStyle(
+        name="BodyStyle",
+        fontSize=12,
+        leading=14,
+        spaceAfter=6,
+        fontName="Helvetica",
+    ),
+}
+STYLES["bullet"] = ParagraphStyle(name="BulletStyle", parent=STYLES["body"], leftIndent=14, bulletIndent=4)
+STYLES["cell"] = ParagraphStyle(name="CellStyle", parent=STYLES["body"], fontSize=10, leading=12, spaceAfter=0)
+STYLES["header_cell"] = ParagraphStyle(name="HeaderCellStyle", parent=STYLES["cell"], fontName="Helvetica-Bold")
+
+TABLE_STYLE = TableStyle([
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightsteelblue),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+])
+
+# Spacing after each kind of block, matching the original report layout.
+SPACE_AFTER = {"heading": 6, "subheading": 4}
+SECTION_SPACE = 12
+
+# One alternative per block kind; each match is a whole line, so the text is scanned once.
+# Captured text may keep trailing blanks; it is stripped only where a block is emitted.
+BLOCK = re.compile(
+    r"""^[ \t]*(?:
+        (?P<subheading>\#{4,6})[ \t]*(?P<subheading_text>[^\n]*)
+      | (?P<heading>\#{3}|\#{1,2}(?=[ \t]))[ \t]*(?P<heading_text>[^\n]*)
+      | (?P<rule>(?:-{3,}|\*{3,}|_{3,}))[ \t]*$
+      | (?P<image>!\[[^\n]*)
+      | [-*+][ \t]+(?P<bullet_text>[^\n]*)
+      | (?P<number>\d+[.)])[ \t]+(?P<number_text>[^\n]*)
+      | (?P<table>\|[^\n]*)
+      | (?P<text>[^\n]*)
+    )""",
+    re.MULTILINE | re.VERBOSE,
+)
+
+TABLE_DIVIDER = re.compile(r"^\|?[\s:|-]+\|?$")
+
+INLINE = re.compile(r"\*\*(?P<bold>.+?)\*\*|__(?P<bold2>.+?)__|\*(?P<italic>[^\s*](?:.*?[^\s*])?)\*|`(?P<code>[^`]+)`")
+
+
+def _inline(match: re.Match) -> str:
+    kind = match.lastgroup
+    text = match.group(kind)
+    if kind in ("bold", "bold2"):
+        return f"<b>{text}</b>"
+    if kind == "italic":
+        return f"<i>{text}</i>"
+    return f'<font name="Courier">{text}</font>'
+
+
+def inline_markup(text: str) -> str:
+    """Escape text for reportlab's paragraph markup and apply bold, italic and code spans."""
+    text = text.rstrip()
+    if "&" in text or "<" in text or ">" in text:
+        text = escape(text)
+    if "*" in text or "`" in text or "__" in text:
+        text = INLINE.sub(_inline, text)
+    return text
+
+
+def _table_row(line: str) -> List[str]:
+    return [inline_markup(cell.strip()) for cell in line.strip().strip("|").split("|")]
+
+
+def build_spec(title: str, content: str) -> Spec:
+    """Tokenize report text into ``(kind, value)`` blocks for ``render_pdf``."""
+    spec: Spec = [("title", escape(title)), ("spacer", SECTION_SPACE)]
+    table: List[List[str]] = []
+
+    for match in BLOCK.finditer(content):
+        kind = match.lastgroup
+        if kind == "table":
+            line = match.group("table").rstrip()
+            if not TABLE_DIVIDER.match(line):
+                table.append(_table_row(line))
+            continue
+        if table:
+            spec.append(("table", table))
+            table = []
+
+        if kind == "subheading_text" or kind == "heading_text":
+            kind = kind[:-len("_text")]
+            spec.append((kind, inline_markup(match.group(f"{kind}_text"))))
+            spec.append(("spacer", SPACE_AFTER[kind]))
+        elif kind == "rule":
+            spec.append(("spacer", SECTION_SPACE))
+        elif kind == "bullet_text":
+            spec.append(("bullet", inline_markup(match.group("bullet_text"))))
+        elif kind == "number_text":
+            spec.append(("body", f"{match.group('number')} {inline_markup(match.group('number_text'))}"))
+        elif kind == "text":
+            text = match.group("text")
+            if text and not text.isspace():
+                spec.append(("body", inline_markup(text)))
+        # Images (e.g. the radar chart placeholder) cannot be fetched here and are left out.
+
+    if table:
+        spec.append(("table", table))
+    spec.append(("spacer", SECTION_SPACE))
+    return spec
+
+
+def _table(rows: List[List[str]]) -> Table:
+    width = max(len(row) for row in rows)
+    cells = [
+        [Paragraph(text, STYLES["header_cell" if index == 0 else "cell"]) for text in row + [""] * (width - len(row))]
+        for index, row in enumerate(rows)
+    ]
+    table = Table(cells, repeatRows=1, hAlign="LEFT")
+    table.setStyle(TABLE_STYLE)
+    return table
+
+
+def build_flowables(spec: Spec) -> list:
+    story = []
+    for kind, value in spec:
+        if kind == "spacer":
+            story.append(Spacer(1, value))
+        elif kind == "table":
+            story.append(_table(value))
+        elif kind == "bullet":
+            story.append(Paragraph(value, STYLES["bullet"], bulletText="•"))
+        else:
+            story.append(Paragraph(value, STYLES[kind]))
+    return story
+
+
+def render_pdf(spec: Spec) -> bytes:
+    """Build the PDF described by spec in memory and return it. Runs in a worker process."""
+    buffer = io.BytesIO()
+    # invariant drops the timestamp and random document id, so identical reports hash identically.
+    doc = SimpleDocTemplate(buffer, pagesize=letter, invariant=1)
+    doc.build(build_flowables(spec))
+    return buffer.getvalue()
@@ -0,0 +1,268 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+SCORE_STORE_PATH = os.environ.get("SCORE_STORE_PATH", os.path.join("data", "scores.sqlite3"))
+
+# Writers stamp updated_at just before they commit, so rows stamped up to this many seconds
+# before the newest one seen may still be in flight and are read again on the next refresh.
+REFRESH_SLACK_SECONDS = 1.0
+
+
+class ScoreStore:
+    """Candidates' trait scores in SQLite, mirrored in memory as a candidates x traits matrix.
+
+    Unscored traits are NaN. Ranking only reads the matrix, so re-weighting thousands of
+    evaluated candidates is a handful of vector operations rather than new LLM calls.
+    Each process keeps its own matrix; ``refresh`` catches up with what other processes
+    sharing the file stored or deleted, and readers call it before ranking.
+    """
+
+    def __init__(self, path: str, capacity: int = 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Guards the in-memory matrix; never held across SQLite calls.
+        self._matrix_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS candidates (
+                candidate TEXT PRIMARY KEY,
+                name TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS candidates_updated_at ON candidates (updated_at);
+            CREATE TABLE IF NOT EXISTS scores (
+                candidate TEXT NOT NULL,
+                trait TEXT NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (candidate, trait)
+            );
+            """
+        )
+        self._conn.commit()
+
+        self._rows: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._names: List[Optional[str]] = []
+        self._columns: Dict[str, int] = {}
+        self._traits: List[str] = []
+        self._matrix = np.full((capacity, 8), np.nan, dtype=np.float32)
+        # Newest updated_at read from the file so far.
+        self._seen = float("-inf")
+        candidates, scores, _ = self._read(self._seen)
+        self._apply(candidates, scores)
+
+    def _read(self, since: float) -> Tuple[list, list, int]:
+        """Candidates stored after ``since`` with their scores, and how many candidates are stored."""
+        with self._lock:
+            # One read transaction, so the three queries see the same snapshot.
+            self._conn.execute("BEGIN")
+            try:
+                candidates = self._conn.execute(
+                    "SELECT candidate, name, updated_at FROM candidates WHERE updated_at > ? ORDER BY rowid", (since,)
+                ).fetchall()
+                scores = self._conn.execute(
+                    "SELECT candidate, trait, score FROM scores "
+                    "WHERE candidate IN (SELECT candidate FROM candidates WHERE updated_at > ?)",
+                    (since,),
+                ).fetchall()
+                count = self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+            finally:
+                self._conn.commit()
+        return candidates, scores, count
+
+    def _apply(self, candidates: list, scores: list):
+        """Copy rows read by ``_read`` into the matrix. Callers hold ``_matrix_lock`` or own the store."""
+        by_candidate: Dict[str, Dict[str, float]] = {}
+        for candidate, trait, score in scores:
+            by_candidate.setdefault(candidate, {})[trait] = score
+        for candidate, name, updated_at in candidates:
+            self._set_row(candidate, by_candidate.get(candidate, {}), name)
+            self._seen = max(self._seen, updated_at)
+
+    async def refresh(self):
+        """Pick up candidates that other processes stored or deleted since the last refresh."""
+        candidates, scores, count = await asyncio.to_thread(self._read, self._seen - REFRESH_SLACK_SECONDS)
+        with self._matrix_lock:
+            self._apply(candidates, scores)
+            # Every stored candidate is now in memory, so extra rows were deleted elsewhere.
+            in_sync = len(self._ids) == count
+        if in_sync:
+            return
+        candidates, scores, _ = await asyncio.to_thread(self._read, float("-inf"))
+        with self._matrix_lock:
+            stored = {candidate for candidate, _, _ in candidates}
+            for candidate in [candidate for candidate in self._ids if candidate not in stored]:
+                self._drop_row(candidate)
+            self._apply(candidates, scores)
+
+    def _column(self, trait: str) -> int:
+        column = self._columns.get(trait)
+        if column is None:
+            column = self._columns[trait] = len(self._traits)
+            self._traits.append(trait)
+            if column >= self._matrix.shape[1]:
+                grown = np.full((self._matrix.shape[0], self._matrix.shape[1] * 2), np.nan, dtype=np.float32)
+                grown[:, :column] = self._matrix
+                self._matrix = grown
+        return column
+
+    def _set_row(self, candidate: str, scores: Dict[str, float], name: Optional[str]):
+        """Replace a candidate's row. Callers hold ``_matrix_lock`` or own the store."""
+        row = self._rows.get(candidate)
+        if row is None:
+            row = self._rows[candidate] = len(self._ids)
+            self._ids.append(candidate)
+            self._names.append(name)
+            if row >= self._matrix.shape[0]:
+                grown = np.full((self._matrix.shape[0] * 2, self._matrix.shape[1]), np.nan, dtype=np.float32)
+                grown[:row] = self._matrix
+                self._matrix = grown
+        elif name is not None:
+            self._names[row] = name
+        columns = [self._column(trait) for trait in scores]
+        self._matrix[row] = np.nan
+        self._matrix[row, columns] = list(scores.values())
+
+    def _save(self, candidate: str, scores: Dict[str, float], name: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO candidates (candidate, name, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (candidate) DO UPDATE SET name = COALESCE(excluded.name, name), updated_at = excluded.updated_at",
+                (candidate, name, time.time()),
+            )
+            self._conn.execute("DELETE FROM scores WHERE candidate = ?", (candidate,))
+            self._conn.executemany(
+                "INSERT INTO scores (candidate, trait, score) VALUES (?, ?, ?)",
+                [(candidate, trait, score) for trait, score in scores.items()],
+            )
+            self._conn.commit()
+
+    def _delete(self, candidate: str) -> bool:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM candidates WHERE candidate = ?", (candidate,)).rowcount
+            self._conn.execute("DELETE FROM scores WHERE candidate = ?", (candidate,))
+            self._conn.commit()
+        return deleted > 0
+
+    async def upsert(self, candidate: str, scores: Dict[str, float], name: Optional[str] = None):
+        """Store a candidate's latest scores, replacing any earlier evaluation."""
+        scores = {trait.lower(): float(score) for trait, score in scores.items()}
+        await asyncio.to_thread(self._save, candidate, scores, name)
+        with self._matrix_lock:
+            self._set_row(candidate, scores, name)
+
+    def _drop_row(self, candidate: str):
+        """Remove a candidate's row. Callers hold ``_matrix_lock``."""
+        row = self._rows.pop(candidate, None)
+        if row is None:
+            return
+        # Move the last row into the freed slot so rows stay dense.
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row], self._names[row] = moved, self._names[last]
+            self._rows[moved] = row
+        self._matrix[last] = np.nan
+        self._ids.pop()
+        self._names.pop()
+
+    async def delete(self, candidate: str) -> bool:
+        deleted = await asyncio.to_thread(self._delete, candidate)
+        with self._matrix_lock:
+            self._drop_row(candidate)
+        return deleted
+
+    def get(self, candidate: str) -> Optional[dict]:
+        with self._matrix_lock:
+            row = self._rows.get(candidate)
+            if row is None:
+                return None
+            return self._describe(row, self._matrix[row, :len(self._traits)])
+
+    def _describe(self, row: int, scores: np.ndarray) -> dict:
+        return {
+            "candidate": self._ids[row],
+            "name": self._names[row],
+            "scores": {trait: round(float(score), 2) for trait, score in zip(self._traits, scores) if not np.isnan(score)},
+        }
+
+    def rank(self, weights: Dict[str, float], k: int = 10, min_coverage: float = 0.0) -> dict:
+        """The k candidates with the highest weighted mean score, best first.
+
+        Each candidate's mean only counts the weighted traits it was scored on; ``coverage``
+        is the share of the total weight those traits carry, and candidates below
+        ``min_coverage`` are left out. Traits no candidate was scored on are reported as
+        ``unknown_traits`` and ignored.
+        """
+        weights = {trait.lower(): float(weight) for trait, weight in weights.items()}
+        with self._matrix_lock:
+            count = len(self._ids)
+            w = np.zeros(len(self._traits), dtype=np.float32)
+            for trait, weight in weights.items():
+                if trait in self._columns:
+                    w[self._columns[trait]] = weight
+            scores = self._matrix[:count, :len(self._traits)]
+            scored = ~np.isnan(scores)
+            weight_scored = scored @ w
+            with np.errstate(invalid="ignore", divide="ignore"):
+                totals = np.where(scored, scores, 0) @ w / weight_scored
+            total_weight = float(w.sum())
+            eligible = (weight_scored > 0) & (weight_scored >= min_coverage * total_weight - 1e-6)
+            ranked = np.flatnonzero(eligible)
+            if k < len(ranked):
+                # Ties keep the order candidates were first stored in.
+                ranked = np.sort(ranked[np.argpartition(-totals[ranked], k - 1)[:k]])
+            ranked = ranked[np.argsort(-totals[ranked], kind="stable")]
+            results = [
+                {
+                    **self._describe(row, scores[row]),
+                    "score": round(float(totals[row]), 3),
+                    "coverage": round(float(weight_scored[row]) / total_weight, 3),
+                }
+                for row in ranked
+            ]
+            unknown = sorted(trait for trait in weights if trait not in self._columns)
+        return {"candidates": count, "ranked": int(eligible.sum()), "unknown_traits": unknown, "results": results}
+
+    def stats(self) -> dict:
+        with self._matrix_lock:
+            scored = ~np.isnan(self._matrix[:len(self._ids), :len(self._traits)])
+            return {
+                "candidates": len(self._ids),
+                "traits": {trait: int(scored[:, column].sum()) for trait, column in self._columns.items()},
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[ScoreStore] = None
+_opening = asyncio.Lock()
+
+
+async def get_score_store() -> ScoreStore:
+    """The app-wide store, loaded into memory in a worker thread on first use."""
+    global _store
+    if _store is None:
+        async with _opening:
+            if _store is None:
+                _store = await asyncio.to_thread(ScoreStore, SCORE_STORE_PATH)
+    return _store
+
+
+def close_score_store():
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
@@ -0,0 +1,77 @@
+import json
+import re
+from typing import Dict, Iterable, Optional
+
+# cultureFit's traits and their default weights (1-10).
+DEFAULT_WEIGHTS = {
+    "resourcefulness": 5,
+    "optimism": 4,
+    "excitement": 4,
+    "reliability": 3,
+    "teamwork": 3,
+}
+
+MAX_SCORE = 10.0
+
+# "8/10", "8 / 10", "4 out of 5"
+SCALED_NUMBER = re.compile(r"(\d+(?:\.\d+)?)\s*(?:/|out of)\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+NUMBER = re.compile(r"\d+(?:\.\d+)?")
+# "(weight: 5)", "weight 5", "w=5", which name a trait's weight rather than its score.
+WEIGHT_MENTION = re.compile(r"\(?\s*(?:weight|w)\s*[:=]?\s*\d+(?:\.\d+)?\s*\)?", re.IGNORECASE)
+JSON_OBJECT = re.compile(r"\{[^{}]*\}")
+
+
+def _in_range(score: float) -> Optional[float]:
+    return score if 0 <= score <= MAX_SCORE else None
+
+
+def _score_after(text: str) -> Optional[float]:
+    """The score in the text following a trait name on its line."""
+    scaled = SCALED_NUMBER.search(text)
+    if scaled:
+        value, scale = float(scaled.group(1)), float(scaled.group(2))
+        return _in_range(value / scale * MAX_SCORE) if scale else None
+    number = NUMBER.search(WEIGHT_MENTION.sub(" ", text))
+    return _in_range(float(number.group())) if number else None
+
+
+def _json_scores(text: str, traits: Dict[str, str]) -> Dict[str, float]:
+    scores = {}
+    for match in JSON_OBJECT.finditer(text):
+        try:
+            candidate = json.loads(match.group())
+        except ValueError:
+            continue
+        for key, value in candidate.items():
+            trait = traits.get(str(key).lower())
+            if trait and isinstance(value, (int, float)) and _in_range(float(value)) is not None:
+                scores[trait] = float(value)
+    return scores
+
+
+def extract_scores(text: str, traits: Iterable[str]) -> Dict[str, float]:
+    """Trait scores (0-10) found in an evaluation, e.g. "**Teamwork:** 8/10" or a JSON object.
+
+    Scores on other scales ("4 out of 5") are rescaled to 10 and weights mentioned next to a
+    trait are ignored. Traits the text does not score are left out.
+    """
+    traits = {trait.lower(): trait for trait in traits}
+    scores = _json_scores(text, traits) if "{" in text else {}
+    for lower, trait in traits.items():
+        if trait in scores:
+            continue
+        pattern = re.compile(rf"\b{re.escape(lower)}\b(?P<rest>[^\n]*)", re.IGNORECASE)
+        for match in pattern.finditer(text):
+            score = _score_after(match.group("rest"))
+            if score is not None:
+                scores[trait] = round(score, 2)
+                break
+    return scores
+
+
+def weighted_score(scores: Dict[str, float], weights: Dict[str, float]) -> Optional[float]:
+    """Weighted mean of the scored traits, or None when no weighted trait was scored."""
+    total = sum(weight for trait, weight in weights.items() if trait in scores)
+    if not total:
+        return None
+    return round(sum(scores[trait] * weight for trait, weight in weights.items() if trait in scores) / total, 3)
@@ -0,0 +1,44 @@
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "2"))
+
+
+class StartupReport:
+    """Wall-clock time spent in each startup phase, checked against a budget.
+
+    Phases are recorded with ``mark(name)``, each covering the time since the previous mark,
+    from app module import through the end of the lifespan startup.
+    """
+
+    def __init__(self, budget: float = STARTUP_BUDGET_SECONDS):
+        self.budget = budget
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: Dict[str, float] = {}
+        self.total: Optional[float] = None
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def finish(self):
+        self.total = self._last - self.started
+        breakdown = ", ".join(f"{phase}={seconds * 1000:.0f}ms" for phase, seconds in self.phases.items())
+        if self.budget and self.total > self.budget:
+            logger.warning("startup took %.3fs, over its %.1fs budget (%s)", self.total, self.budget, breakdown)
+        else:
+            logger.info("startup took %.3fs (%s)", self.total, breakdown)
+
+    def as_dict(self) -> dict:
+        return {
+            "total_seconds": self.total,
+            "budget_seconds": self.budget,
+            "within_budget": None if self.total is None else not self.budget or self.total <= self.budget,
+            "phases": {phase: round(seconds, 6) for phase, seconds in self.phases.items()},
+        }
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from app.utils.cache import CACHE_DIR
+
+
+@dataclass
+class FormSchema:
+    fields: Dict[str, str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    checked_at: float
+
+
+def account_key(api_key: str) -> str:
+    """Partition stored data by API key without keeping the key itself."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class TypeformStore:
+    """Local SQLite copy of Typeform form field mappings and synced responses."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS forms (
+                account TEXT NOT NULL,
+                form_id TEXT NOT NULL,
+                fields TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (account, form_id)
+            );
+            CREATE TABLE IF NOT EXISTS responses (
+                account TEXT NOT NULL,
+                form_id TEXT NOT NULL,
+                response_id TEXT NOT NULL,
+                submitted_at TEXT NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (account, form_id, response_id)
+            );
+            CREATE INDEX IF NOT EXISTS responses_by_time ON responses (account, form_id, submitted_at);
+            CREATE TABLE IF NOT EXISTS backfills (
+                account TEXT NOT NULL,
+                form_id TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (account, form_id)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _get_form(self, account: str, form_id: str) -> Optional[FormSchema]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fields, etag, last_modified, checked_at FROM forms WHERE account = ? AND form_id = ?",
+                (account, form_id),
+            ).fetchone()
+        if row is None:
+            return None
+        return FormSchema(fields=json.loads(row[0]), etag=row[1], last_modified=row[2], checked_at=row[3])
+
+    def _save_form(self, account: str, form_id: str, schema: FormSchema):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO forms (account, form_id, fields, etag, last_modified, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (account, form_id, json.dumps(schema.fields), schema.etag, schema.last_modified, schema.checked_at),
+            )
+            self._conn.commit()
+
+    def _touch_form(self, account: str, form_id: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE forms SET checked_at = ? WHERE account = ? AND form_id = ?",
+                (time.time(), account, form_id),
+            )
+            self._conn.commit()
+
+    def _add_responses(self, account: str, form_id: str, items: List[dict]) -> int:
+        rows = [
+            (account, form_id, item.get("response_id") or item.get("token"), item.get("submitted_at", ""), json.dumps(item))
+            for item in items
+            if item.get("response_id") or item.get("token")
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO responses (account, form_id, response_id, submitted_at, body) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def _latest_submitted_at(self, account: str, form_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(submitted_at) FROM responses WHERE account = ? AND form_id = ?",
+                (account, form_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _oldest_response_id(self, account: str, form_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response_id FROM responses WHERE account = ? AND form_id = ? ORDER BY submitted_at LIMIT 1",
+                (account, form_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _is_backfilled(self, account: str, form_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM backfills WHERE account = ? AND form_id = ?", (account, form_id)
+            ).fetchone()
+        return row is not None
+
+    def _mark_backfilled(self, account: str, form_id: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO backfills (account, form_id, completed_at) VALUES (?, ?, ?)",
+                (account, form_id, time.time()),
+            )
+            self._conn.commit()
+
+    def _latest_responses(self, account: str, form_id: str, limit: Optional[int]) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT body FROM responses WHERE account = ? AND form_id = ? ORDER BY submitted_at DESC LIMIT ?",
+                (account, form_id, -1 if limit is None else limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    async def get_form(self, account: str, form_id: str) -> Optional[FormSchema]:
+        return await asyncio.to_thread(self._get_form, account, form_id)
+
+    async def save_form(self, account: str, form_id: str, schema: FormSchema):
+        await asyncio.to_thread(self._save_form, account, form_id, schema)
+
+    async def touch_form(self, account: str, form_id: str):
+        await asyncio.to_thread(self._touch_form, account, form_id)
+
+    async def add_responses(self, account: str, form_id: str, items: List[dict]) -> int:
+        return await asyncio.to_thread(self._add_responses, account, form_id, items)
+
+    async def latest_submitted_at(self, account: str, form_id: str) -> Optional[str]:
+        return await asyncio.to_thread(self._latest_submitted_at, account, form_id)
+
+    async def latest_responses(self, account: str, form_id: str, limit: Optional[int] = 1) -> List[dict]:
+        """Return stored responses, newest first; ``limit=None`` returns all of them."""
+        return await asyncio.to_thread(self._latest_responses, account, form_id, limit)
+
+    async def oldest_response_id(self, account: str, form_id: str) -> Optional[str]:
+        return await asyncio.to_thread(self._oldest_response_id, account, form_id)
+
+    async def is_backfilled(self, account: str, form_id: str) -> bool:
+        return await asyncio.to_thread(self._is_backfilled, account, form_id)
+
+    async def mark_backfilled(self, account: str, form_id: str):
+        await asyncio.to_thread(self._mark_backfilled, account, form_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[TypeformStore] = None
+
+
+def get_store() -> TypeformStore:
+    global _store
+    if _store is None:
+        _store = TypeformStore(os.path.join(CACHE_DIR, "typeform.sqlite3"))
+    return _store
+
+
+def close_store():
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
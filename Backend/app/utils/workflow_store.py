@@ -0,0 +1,120 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+from app.models import Workflow
+from app.utils.graph_utils import ExecutionPlan, compile_workflow
+
+WORKFLOW_STORE_PATH = os.environ.get("WORKFLOW_STORE_PATH", os.path.join("data", "workflows.sqlite3"))
+
+
+class WorkflowStore:
+    """Saved workflow definitions in SQLite, with their compiled plans kept in memory.
+
+    Definitions are validated and compiled once when saved; runs by id reuse the plan and
+    only fall back to the stored JSON after a restart or when the plan was evicted.
+    """
+
+    def __init__(self, path: str, max_plans: int = 256):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_plans = max_plans
+        self._plans: "OrderedDict[str, ExecutionPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS workflows (
+                id TEXT PRIMARY KEY,
+                definition TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def serialize(workflow: Workflow) -> str:
+        """Compact JSON for storage, without the editor-only node positions."""
+        return workflow.model_dump_json(exclude={"nodes": {"__all__": {"position"}}}, exclude_none=True)
+
+    def _save(self, workflow_id: str, definition: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO workflows (id, definition, created_at) VALUES (?, ?, ?)",
+                (workflow_id, definition, time.time()),
+            )
+            self._conn.commit()
+
+    def _get(self, workflow_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT definition FROM workflows WHERE id = ?", (workflow_id,)).fetchone()
+        return row[0] if row else None
+
+    def _delete(self, workflow_id: str) -> bool:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM workflows WHERE id = ?", (workflow_id,)).rowcount
+            self._conn.commit()
+        return deleted > 0
+
+    def _remember(self, workflow_id: str, plan: ExecutionPlan):
+        self._plans[workflow_id] = plan
+        self._plans.move_to_end(workflow_id)
+        while len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+
+    async def save(self, workflow: Workflow, plan: ExecutionPlan) -> str:
+        """Store a validated workflow with its compiled plan and return its new id."""
+        workflow_id = uuid.uuid4().hex
+        await asyncio.to_thread(self._save, workflow_id, self.serialize(workflow))
+        self._remember(workflow_id, plan)
+        return workflow_id
+
+    async def get_definition(self, workflow_id: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, workflow_id)
+
+    async def get_plan(self, workflow_id: str) -> Optional[ExecutionPlan]:
+        plan = self._plans.get(workflow_id)
+        if plan is not None:
+            self._plans.move_to_end(workflow_id)
+            return plan
+        definition = await self.get_definition(workflow_id)
+        if definition is None:
+            return None
+        plan = compile_workflow(Workflow.model_validate_json(definition))
+        self._remember(workflow_id, plan)
+        return plan
+
+    async def delete(self, workflow_id: str) -> bool:
+        self._plans.pop(workflow_id, None)
+        return await asyncio.to_thread(self._delete, workflow_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[WorkflowStore] = None
+
+
+def get_workflow_store() -> WorkflowStore:
+    global _store
+    if _store is None:
+        _store = WorkflowStore(
+            WORKFLOW_STORE_PATH,
+            max_plans=int(os.environ.get("WORKFLOW_PLAN_CACHE_SIZE", "256")),
+        )
+    return _store
+
+
+def close_workflow_store():
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
@@ -0,0 +1,107 @@
+"""Microbenchmarks for graph planning, combine_text, PDF generation and score ranking.
+
+    python -m benchmarks.bench_micro
+    python -m benchmarks.bench_micro --only graph --sizes 100,1000,5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.models import Node, Workflow  # noqa: E402
+from app.utils.graph_utils import compile_workflow, get_outgoers, get_start_nodes  # noqa: E402
+from benchmarks.workflows import build  # noqa: E402
+
+
+def report(name: str, seconds_per_call: float):
+    if seconds_per_call >= 1e-3:
+        print(f"{name:<48} {seconds_per_call * 1e3:10.3f} ms")
+    else:
+        print(f"{name:<48} {seconds_per_call * 1e6:10.1f} us")
+
+
+def measure(func, min_time: float = 0.5) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = max(1, int(min_time / max(timer.timeit(number) / number, 1e-9)))
+    return min(timer.repeat(repeat=3, number=runs)) / runs
+
+
+def bench_graph(sizes):
+    for size in sizes:
+        workflow = Workflow(**build("fan_out", size))
+        report(f"compile_workflow fan_out n={size}", measure(lambda: compile_workflow(workflow)))
+        report(f"get_start_nodes fan_out n={size}", measure(lambda: get_start_nodes(workflow.nodes, workflow.edges)))
+        report(
+            f"get_outgoers for every node n={size}",
+            measure(lambda: [get_outgoers(node.id, workflow.edges) for node in workflow.nodes], min_time=0.2),
+        )
+
+
+def bench_combine_text(sizes):
+    from app.handlers import combine_text
+
+    from app.run_context import RunContext
+    from app.utils.node_output import NodeOutput
+
+    profile = {"full_name": "Ann", "experiences": [{"title": "Engineer"}] * 50}
+    for size in sizes:
+        node = Node(id="c", type="combineText", position={"x": 0, "y": 0}, data={})
+        ctx = RunContext.for_node(node, [NodeOutput(value=profile) for _ in range(size)])
+        report(
+            f"combine_text.execute inputs={size}",
+            measure(lambda: asyncio.run(combine_text.execute(ctx)), min_time=0.2),
+        )
+
+
+def bench_pdf(sizes):
+    from app.utils import report_rendering
+
+    paragraph = "### Section\n**Strengths**\n- Clear communicator\n1. Teamwork: 8/10\n*Summary*\n" + "Plain text line. " * 10
+    for size in sizes:
+        content = "\n".join([paragraph] * size)
+        report(
+            f"pdf build_spec sections={size}",
+            measure(lambda: report_rendering.build_spec("Report", content), min_time=0.2),
+        )
+        spec = report_rendering.build_spec("Report", content)
+        report(f"pdf render_pdf sections={size}", measure(lambda: report_rendering.render_pdf(spec), min_time=0.5))
+
+
+def bench_rank(sizes):
+    import random
+    import tempfile
+    from app.utils.score_store import ScoreStore
+    from app.utils.scores import DEFAULT_WEIGHTS, extract_scores
+
+    evaluation = "\n".join(f"**{trait.title()}** (weight {weight}): 7/10 - solid" for trait, weight in DEFAULT_WEIGHTS.items())
+    report("extract_scores traits=5", measure(lambda: extract_scores(evaluation, DEFAULT_WEIGHTS), min_time=0.2))
+
+    rng = random.Random(0)
+    weights = {"teamwork": 10, "reliability": 6, "optimism": 1}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            store = ScoreStore(os.path.join(directory, "scores.sqlite3"))
+            # Filled in memory only; ranking never reads SQLite.
+            for index in range(size):
+                store._set_row(f"c{index}", {trait: rng.randint(0, 10) for trait in DEFAULT_WEIGHTS if rng.random() > 0.1}, None)
+            report(f"ScoreStore.rank top 10 candidates={size}", measure(lambda: store.rank(weights, 10), min_time=0.2))
+            store.close()
+
+
+BENCHES = {"graph": bench_graph, "combine": bench_combine_text, "pdf": bench_pdf, "rank": bench_rank}
+DEFAULT_SIZES = {"graph": [10, 100, 1000], "combine": [2, 20, 200], "pdf": [1, 10, 100], "rank": [1000, 10000, 100000]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", choices=list(BENCHES), action="append")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")])
+    args = parser.parse_args()
+    for name in args.only or list(BENCHES):
+        BENCHES[name](args.sizes or DEFAULT_SIZES[name])
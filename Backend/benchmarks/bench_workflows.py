@@ -0,0 +1,135 @@
+"""End-to-end /execute-workflow benchmarks against local mock upstreams.
+
+Runs the FastAPI app in-process (ASGI transport, real lifespan) and points its
+handlers at ``mock_upstreams``. For each shape/size scenario it reports
+throughput, p50/p99 request latency and, with --memory, peak traced memory.
+
+    python -m benchmarks.bench_workflows --shapes chain,fan_out,diamond --sizes 10,100,1000
+    python -m benchmarks.bench_workflows --node-type askAI --latency 0.2 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.mock_upstreams import MockUpstreamServer, UpstreamBehaviour
+from benchmarks.workflows import SHAPES, build
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def prepare_environment(server: MockUpstreamServer, workdir: str):
+    """Point the app at the mock upstreams and keep caches out of the measurements."""
+    os.environ.update(server.environ())
+    os.environ.setdefault("GEMINI_FLASH_THINKING_KEY", "benchmark")
+    os.environ.setdefault("DEEPSEEK_API_KEY", "benchmark")
+    os.environ.setdefault("RELEVANCE_API_TOKEN", "benchmark")
+    os.environ.setdefault("RELEVANCE_PROJECT_ID", "benchmark")
+    os.environ.setdefault("LLM_RATE_PER_SECOND", "10000")
+    os.environ.setdefault("LLM_BURST", "10000")
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", "256")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["CACHE_DIR"] = os.path.join(workdir, "cache")
+    os.chdir(workdir)
+    os.makedirs("generated_pdfs", exist_ok=True)
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+async def run_scenario(client, payload: dict, requests: int, concurrency: int, measure_memory: bool) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/execute-workflow", json=payload)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                failures += 1
+
+    if measure_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    peak = None
+    if measure_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "failures": failures,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "peak_memory_mb": peak / 2 ** 20 if peak is not None else None,
+    }
+
+
+async def main(args) -> list:
+    import httpx
+    from app.main import app
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for shape_name in args.shapes:
+                for size in args.sizes:
+                    payload = build(shape_name, size, args.node_type)
+                    # One warm-up request so imports and pools are not billed to the first sample.
+                    await client.post("/execute-workflow", json=payload)
+                    stats = await run_scenario(client, payload, args.requests, args.concurrency, args.memory)
+                    stats.update(shape=shape_name, nodes=len(payload["nodes"]), node_type=args.node_type)
+                    results.append(stats)
+                    print(
+                        f"{shape_name:<8} nodes={stats['nodes']:<5} rps={stats['throughput_rps']:8.2f} "
+                        f"p50={stats['p50_ms']:8.1f}ms p99={stats['p99_ms']:8.1f}ms failures={stats['failures']}"
+                        + (f" peak={stats['peak_memory_mb']:.1f}MB" if args.memory else "")
+                    )
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shapes", type=lambda s: s.split(","), default=list(SHAPES))
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[10, 100, 1000])
+    parser.add_argument("--node-type", default="combineText",
+                        choices=["combineText", "askAI", "linkedIn", "typeform", "pdfGenerator"])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock upstream latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--memory", action="store_true", help="trace peak memory (slows the run down)")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    behaviour = UpstreamBehaviour(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    with tempfile.TemporaryDirectory() as workdir, MockUpstreamServer(behaviour, port=args.port) as server:
+        prepare_environment(server, workdir)
+        results = asyncio.run(main(args))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
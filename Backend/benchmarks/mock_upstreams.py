@@ -0,0 +1,157 @@
+"""Local stand-ins for OpenRouter, Relevance AI and Typeform.
+
+Every route sleeps for a configurable latency (with jitter) and can inject
+errors, so benchmarks exercise the real handlers and HTTP clients without
+touching the network or spending quota.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class UpstreamBehaviour:
+    latency: float = 0.05
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 429
+    completion_tokens: int = 200
+
+    async def delay(self):
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+def create_app(behaviour: UpstreamBehaviour) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        await behaviour.delay()
+        if behaviour.should_fail():
+            return JSONResponse(
+                {"error": {"code": behaviour.error_status, "message": "Injected upstream error"}},
+                status_code=behaviour.error_status,
+                headers={"Retry-After": "1"},
+            )
+
+        words = [f"token{i} " for i in range(behaviour.completion_tokens)]
+        if not payload.get("stream"):
+            return {"choices": [{"message": {"content": "".join(words)}}]}
+
+        async def stream():
+            yield ": OPENROUTER PROCESSING\n\n"
+            for word in words:
+                yield f"data: {json.dumps({'choices': [{'delta': {'content': word}}]})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.post("/relevance/trigger_webhook")
+    async def relevance_webhook(request: Request):
+        payload = await request.json()
+        await behaviour.delay()
+        if behaviour.should_fail():
+            return JSONResponse({"error": "Injected upstream error"}, status_code=behaviour.error_status)
+        slug = payload.get("url", "").rstrip("/").split("/")[-1]
+        return {
+            "linkedin_full_data": {
+                "full_name": slug.title(),
+                "headline": "Senior Engineer",
+                "about": "Builds things. " * 50,
+                "experiences": [
+                    {"title": f"Engineer {i}", "company": f"Company {i}", "description": "Did work. " * 20}
+                    for i in range(8)
+                ],
+                "educations": [{"school": "University", "degree": "BSc"}],
+                "languages": ["English"],
+            }
+        }
+
+    @app.get("/forms/{form_id}/responses")
+    async def typeform_responses(form_id: str, page_size: int = 25):
+        await behaviour.delay()
+        if behaviour.should_fail():
+            return JSONResponse({"description": "Injected upstream error"}, status_code=behaviour.error_status)
+        items = [
+            {
+                "response_id": f"{form_id}-{i}",
+                "submitted_at": f"2024-01-{i + 1:02d}T00:00:00Z",
+                "answers": [
+                    {"field": {"id": "q1"}, "type": "text", "text": f"Answer {i}"},
+                    {"field": {"id": "q2"}, "type": "number", "number": i},
+                ],
+            }
+            for i in range(min(page_size, 28))
+        ]
+        return {"items": list(reversed(items))}
+
+    @app.get("/forms/{form_id}")
+    async def typeform_form(form_id: str):
+        await behaviour.delay()
+        return JSONResponse(
+            {"fields": [{"id": "q1", "title": "Why us?"}, {"id": "q2", "title": "Years of experience"}]},
+            headers={"ETag": f'"{form_id}-v1"'},
+        )
+
+    return app
+
+
+class MockUpstreamServer:
+    """Run the mock upstream app with uvicorn in a background thread."""
+
+    def __init__(self, behaviour: UpstreamBehaviour, host: str = "127.0.0.1", port: int = 8765):
+        self.host = host
+        self.port = port
+        config = uvicorn.Config(create_app(behaviour), host=host, port=port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def environ(self) -> dict:
+        """Environment variables that point the app's handlers at this server."""
+        return {
+            "OPENROUTER_API_URL": f"{self.base_url}/api/v1/chat/completions",
+            "RELEVANCE_API_URL": f"{self.base_url}/relevance/trigger_webhook",
+            "TYPEFORM_API_URL": self.base_url,
+        }
+
+    def __enter__(self) -> "MockUpstreamServer":
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline:
+                raise RuntimeError("Mock upstream server did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve mock OpenRouter/Relevance/Typeform upstreams.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    behaviour = UpstreamBehaviour(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    uvicorn.run(create_app(behaviour), host="127.0.0.1", port=args.port)
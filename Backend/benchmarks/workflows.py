@@ -0,0 +1,79 @@
+"""Synthetic workflow generators for benchmarks.
+
+Every generator returns a JSON-ready React Flow style payload with ``n`` nodes.
+``node_type`` picks what the inner nodes do: ``combineText`` keeps the run
+CPU-only, ``askAI``/``linkedIn``/``typeform`` hit the mock upstreams.
+"""
+from typing import Callable, Dict, List
+
+SHAPES: Dict[str, Callable[..., dict]] = {}
+
+
+def shape(func):
+    SHAPES[func.__name__] = func
+    return func
+
+
+def make_node(node_id: str, node_type: str, index: int) -> dict:
+    data = {"label": node_id}
+    if node_type == "cultureFit":
+        data.update(companyValues="Ownership, candour and curiosity", weights={"teamwork": 4, "reliability": 3})
+    elif node_type == "askAI":
+        data.update(prompt=f"Evaluate candidate fit #{index}", model="gemini", useCache=False)
+    elif node_type == "linkedIn":
+        data.update(profileUrl=f"https://www.linkedin.com/in/candidate-{index}", useCache=False)
+    elif node_type == "typeform":
+        data.update(formId=f"form{index}", apiKey="benchmark")
+    elif node_type == "pdfGenerator":
+        data.update(title=f"Report {index}")
+    return {"id": node_id, "type": node_type, "position": {"x": 0, "y": 0}, "data": data}
+
+
+def edge(source: str, target: str) -> dict:
+    return {"id": f"{source}->{target}", "source": source, "target": target}
+
+
+@shape
+def chain(n: int, node_type: str = "combineText") -> dict:
+    """root -> n1 -> n2 -> ... -> n(n-1)"""
+    nodes = [make_node("n0", "cultureFit", 0)]
+    nodes += [make_node(f"n{i}", node_type, i) for i in range(1, n)]
+    edges = [edge(f"n{i - 1}", f"n{i}") for i in range(1, n)]
+    return {"nodes": nodes, "edges": edges}
+
+
+@shape
+def fan_out(n: int, node_type: str = "combineText") -> dict:
+    """root -> (n - 2) independent nodes -> one combineText sink"""
+    width = max(1, n - 2)
+    nodes = [make_node("root", "cultureFit", 0)]
+    nodes += [make_node(f"w{i}", node_type, i) for i in range(width)]
+    nodes.append(make_node("sink", "combineText", width))
+    edges = [edge("root", f"w{i}") for i in range(width)]
+    edges += [edge(f"w{i}", "sink") for i in range(width)]
+    return {"nodes": nodes, "edges": edges}
+
+
+@shape
+def diamond(n: int, node_type: str = "combineText") -> dict:
+    """A chain of diamonds: top -> (left, right) -> bottom, where each bottom is the next top.
+
+    The joins are cultureFit nodes, which ignore their inputs, so output sizes stay
+    flat instead of doubling at every diamond.
+    """
+    nodes: List[dict] = [make_node("d0", "cultureFit", 0)]
+    edges: List[dict] = []
+    top = "d0"
+    index = 1
+    while index + 2 < n:
+        left, right, bottom = f"d{index}", f"d{index + 1}", f"d{index + 2}"
+        nodes += [make_node(left, node_type, index), make_node(right, node_type, index + 1)]
+        nodes.append(make_node(bottom, "cultureFit", index + 2))
+        edges += [edge(top, left), edge(top, right), edge(left, bottom), edge(right, bottom)]
+        top = bottom
+        index += 3
+    return {"nodes": nodes, "edges": edges}
+
+
+def build(shape_name: str, n: int, node_type: str = "combineText") -> dict:
+    return SHAPES[shape_name](n, node_type)
@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+# Handler modules read these at import time; point every store at a scratch directory.
+_scratch = tempfile.mkdtemp(prefix="aivortex-tests-")
+os.environ.setdefault("CACHE_DIR", os.path.join(_scratch, "cache"))
+os.environ.setdefault("WORKFLOW_STORE_PATH", os.path.join(_scratch, "workflows.sqlite3"))
+os.environ.setdefault("SCORE_STORE_PATH", os.path.join(_scratch, "scores.sqlite3"))
+os.environ.setdefault("PDF_STORE_DIR", os.path.join(_scratch, "pdfs"))
+for variable in ("RELEVANCE_API_TOKEN", "RELEVANCE_PROJECT_ID", "GEMINI_FLASH_THINKING_KEY", "DEEPSEEK_API_KEY"):
+    os.environ.setdefault(variable, "test")
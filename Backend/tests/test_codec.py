@@ -0,0 +1,125 @@
+import asyncio
+import gzip
+import msgpack
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from app import main
+from app.utils import codec
+from app.utils.node_output import JSON, NodeOutput
+
+WORKFLOW = {
+    "nodes": [{"id": "intro", "type": "combineText", "data": {"content": "Hello", "extra": [1, 2]}}],
+    "edges": [],
+}
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def respond(content, **headers):
+    return asyncio.run(codec.encoded_response(make_request(**headers), content))
+
+
+def test_dumps_embeds_json_text_as_is_and_encodes_values():
+    profile = NodeOutput(text='{"name": "Ada", "skills": ["math"]}', media_type=JSON)
+    content = {"results": {"profile": profile, "summary": NodeOutput(value={"score": 8}), 1: "text"}}
+    body = codec.dumps(content)
+    assert b'{"name": "Ada", "skills": ["math"]}' in body
+    assert orjson.loads(body) == {"results": {"profile": {"name": "Ada", "skills": ["math"]}, "summary": {"score": 8}, "1": "text"}}
+
+
+def test_json_response_round_trip():
+    content = {"results": {"a": NodeOutput(value=[1, "two", None])}, "status": {"a": "ok"}}
+    response = respond(content)
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == {"results": {"a": [1, "two", None]}, "status": {"a": "ok"}}
+
+
+def test_msgpack_response_round_trip():
+    content = {"results": {"a": NodeOutput(value={"score": 8.5}), "b": "text"}}
+    response = respond(content, accept="application/msgpack")
+    assert response.media_type == "application/msgpack"
+    assert msgpack.unpackb(response.body) == {"results": {"a": {"score": 8.5}, "b": "text"}}
+
+
+@pytest.mark.parametrize("accept, media_type", [
+    ("", "application/json"),
+    ("*/*", "application/json"),
+    ("application/x-msgpack", "application/msgpack"),
+    ("application/json, application/msgpack", "application/msgpack"),
+    ("application/json, application/msgpack;q=0.5", "application/json"),
+    ("application/json;q=0.2, application/msgpack;q=0.8", "application/msgpack"),
+    ("application/msgpack;q=0", "application/json"),
+])
+def test_accept_negotiation(accept, media_type):
+    assert respond({"ok": True}, accept=accept).media_type == media_type
+
+
+LARGE = {"text": "x" * 4096}
+
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("identity", None),
+    ("", None),
+])
+def test_content_encoding_selection(accept_encoding, encoding):
+    if encoding == "br" and not codec.BROTLI_AVAILABLE:
+        pytest.skip("brotli is not installed")
+    response = respond(LARGE, accept_encoding=accept_encoding)
+    assert response.headers.get("content-encoding") == encoding
+    assert "Accept-Encoding" in response.headers["vary"]
+    decompress = {"br": lambda body: codec.brotli.decompress(body), "gzip": gzip.decompress, None: bytes}[encoding]
+    body = decompress(response.body)
+    assert orjson.loads(body) == LARGE
+
+
+def test_gzip_without_brotli(monkeypatch):
+    monkeypatch.setattr(codec, "BROTLI_AVAILABLE", False)
+    response = respond(LARGE, accept_encoding="br, gzip")
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_small_bodies_are_not_compressed():
+    assert "content-encoding" not in respond({"ok": True}, accept_encoding="gzip, br").headers
+
+
+def test_msgpack_request_body_round_trip():
+    client = TestClient(main.app)
+    created = client.post("/workflows", content=msgpack.packb(WORKFLOW), headers={"content-type": "application/msgpack"})
+    assert created.status_code == 201
+    stored = client.get(f"/workflows/{created.json()['id']}").json()
+    assert stored["nodes"][0]["data"]["content"] == "Hello"
+    assert stored["nodes"][0]["data"]["extra"] == [1, 2]
+
+
+def test_invalid_bodies_are_rejected():
+    client = TestClient(main.app)
+    garbled = client.post("/workflows", content=b"\xc1", headers={"content-type": "application/msgpack"})
+    assert garbled.status_code == 400
+    invalid = client.post("/workflows", json={"nodes": "none"})
+    assert invalid.status_code == 422
+    assert {tuple(error["loc"]) for error in invalid.json()["detail"]} == {("body", "nodes"), ("body", "edges")}
+
+
+def test_request_schemas_are_documented():
+    schema = TestClient(main.app).get("/openapi.json").json()
+    body = schema["paths"]["/execute-workflow"]["post"]["requestBody"]
+    assert body["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/Workflow"}
+    assert body["content"]["application/msgpack"]["schema"] == {"$ref": "#/components/schemas/Workflow"}
+    run = schema["paths"]["/workflows/{workflow_id}/run"]["post"]["requestBody"]
+    assert run["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/WorkflowRunRequest"}
+    components = schema["components"]["schemas"]
+    for name in ("Workflow", "Node", "NodeData", "Edge", "BatchWorkflowRequest", "WorkflowRunRequest"):
+        assert name in components
+    assert components["Workflow"]["properties"]["nodes"]["items"] == {"$ref": "#/components/schemas/Node"}
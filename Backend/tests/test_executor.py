@@ -0,0 +1,174 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.executor import execute_plan
+from app.models import Workflow
+from app.utils.graph_utils import WorkflowGraphError, compile_workflow
+
+
+def workflow(nodes: dict, edges: list, **options) -> Workflow:
+    """A workflow from {id: (type, data)} and [(source, target)] pairs."""
+    return Workflow(
+        nodes=[{"id": node_id, "type": node_type, "data": data} for node_id, (node_type, data) in nodes.items()],
+        edges=[{"source": source, "target": target} for source, target in edges],
+        **options,
+    )
+
+
+class Handlers(dict):
+    """Fake handlers: "echo" joins its inputs, "slow" sleeps for its data's ``seconds``,
+    "fail" returns the error text handlers report failures with."""
+
+    def __init__(self):
+        super().__init__(echo=self.echo, slow=self.slow, fail=self.fail)
+        self.cancelled = []
+        self.calls = []
+
+    async def echo(self, ctx):
+        self.calls.append(ctx.node_id)
+        return "+".join([ctx.node_id, *(output.text for output in ctx.inputs)])
+
+    async def fail(self, ctx):
+        return "Error fetching Typeform responses: 503\nService unavailable"
+
+    async def slow(self, ctx):
+        try:
+            await asyncio.sleep(ctx.get("seconds"))
+        except asyncio.CancelledError:
+            self.cancelled.append(ctx.node_id)
+            raise
+        return ctx.node_id
+
+
+def run(plan, handlers):
+    status = {}
+    outputs = asyncio.run(execute_plan(plan, handlers, None, status=status))
+    return outputs, status
+
+
+def test_cycle_is_rejected_with_a_400():
+    body = workflow(
+        {"a": ("echo", {}), "b": ("echo", {}), "c": ("echo", {})},
+        [("a", "b"), ("b", "c"), ("c", "b")],
+    )
+    with pytest.raises(WorkflowGraphError, match="Circular dependency"):
+        compile_workflow(body)
+    response = TestClient(main.app).post("/execute-workflow", json=body.model_dump())
+    assert response.status_code == 400
+    assert "Circular dependency" in response.json()["detail"]
+
+
+def test_node_timeout_skips_only_its_descendants():
+    plan = compile_workflow(workflow(
+        {
+            "start": ("echo", {}),
+            "stuck": ("slow", {"seconds": 5, "timeout": 0.05}),
+            "after_stuck": ("echo", {}),
+            "joined": ("echo", {}),
+            "other": ("echo", {}),
+            "after_other": ("echo", {}),
+        },
+        [
+            ("start", "stuck"), ("stuck", "after_stuck"), ("after_stuck", "joined"),
+            ("start", "other"), ("other", "after_other"), ("other", "joined"),
+        ],
+    ))
+    handlers = Handlers()
+    outputs, status = run(plan, handlers)
+    assert status == {
+        "start": "ok",
+        "stuck": "timeout",
+        "after_stuck": "skipped",
+        "joined": "skipped",
+        "other": "ok",
+        "after_other": "ok",
+    }
+    assert outputs["after_other"].text == "after_other+other+start"
+    assert "after_stuck" not in outputs and "joined" not in outputs
+    assert handlers.cancelled == ["stuck"]
+
+
+def test_workflow_timeout_cancels_the_run():
+    plan = compile_workflow(workflow(
+        {
+            "fast": ("echo", {}),
+            "stuck": ("slow", {"seconds": 5, "timeout": 0}),
+            "after_stuck": ("echo", {}),
+        },
+        [("stuck", "after_stuck")],
+        timeout=0.1,
+    ))
+    handlers = Handlers()
+    outputs, status = run(plan, handlers)
+    assert status == {"fast": "ok", "stuck": "cancelled", "after_stuck": "skipped"}
+    assert list(outputs) == ["fast"]
+    assert handlers.cancelled == ["stuck"]
+
+
+def test_map_fails_on_an_error_input_without_running_items():
+    plan = compile_workflow(workflow(
+        {
+            "source": ("fail", {}),
+            "m": ("map", {}),
+            "body": ("echo", {}),
+            "r": ("reduce", {}),
+            "after": ("echo", {}),
+        },
+        [("source", "m"), ("m", "body"), ("body", "r"), ("r", "after")],
+    ))
+    handlers = Handlers()
+    with pytest.raises(ValueError, match="Map node m got an error from source"):
+        run(plan, handlers)
+    assert handlers.calls == []
+
+
+def test_map_runs_its_body_per_line_of_text():
+    plan = compile_workflow(workflow(
+        {"source": ("echo", {}), "m": ("map", {}), "body": ("echo", {}), "r": ("reduce", {})},
+        [("source", "m"), ("m", "body"), ("body", "r")],
+    ))
+    handlers = Handlers()
+    outputs, status = run(plan, handlers)
+    assert status == {"source": "ok", "m": "ok", "r": "ok"}
+    assert outputs["r"].value == ["body+source"]
+
+
+MALFORMED_REGIONS = {
+    "no reduce": (
+        {"m": ("map", {}), "body": ("echo", {})},
+        [("m", "body")],
+        "has no reduce node downstream",
+    ),
+    "branch escapes": (
+        {"m": ("map", {}), "body": ("echo", {}), "r": ("reduce", {}), "out": ("echo", {})},
+        [("m", "body"), ("body", "r"), ("body", "out")],
+        "feeds nodes outside it",
+    ),
+    "nested map": (
+        {"m": ("map", {}), "inner": ("map", {}), "body": ("echo", {}), "r": ("reduce", {})},
+        [("m", "inner"), ("inner", "body"), ("body", "r")],
+        "nested maps are not supported",
+    ),
+    "orphan reduce": (
+        {"a": ("echo", {}), "r": ("reduce", {})},
+        [("a", "r")],
+        "has no map node upstream",
+    ),
+    "bad concurrency": (
+        {"m": ("map", {"concurrency": 0}), "body": ("echo", {}), "r": ("reduce", {})},
+        [("m", "body"), ("body", "r")],
+        "concurrency must be a positive integer",
+    ),
+}
+
+
+@pytest.mark.parametrize("case", MALFORMED_REGIONS)
+def test_malformed_map_regions_are_rejected_at_compile_time(case):
+    nodes, edges, message = MALFORMED_REGIONS[case]
+    body = workflow(nodes, edges)
+    with pytest.raises(WorkflowGraphError, match=message):
+        compile_workflow(body)
+    response = TestClient(main.app).post("/execute-workflow", json=body.model_dump())
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
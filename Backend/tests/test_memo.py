@@ -0,0 +1,85 @@
+import asyncio
+from app.memo import NodeMemo
+from app.models import Node
+from app.utils.cache import MemoryTier, TieredCache
+from app.utils.node_output import JSON, NodeOutput
+
+
+def make_memo() -> NodeMemo:
+    return NodeMemo(TieredCache("node-test", [MemoryTier()], ttl=60))
+
+
+def make_node(node_type: str = "askAI", **data) -> Node:
+    return Node(id="n", type=node_type, position={"x": 0, "y": 0}, data=data)
+
+
+OUTPUTS = {"a": "first parent", "b": NodeOutput(value={"answer": 42})}
+
+
+def test_key_is_stable_across_runs_and_field_order():
+    first = make_memo().key(make_node(prompt="Summarise", model="deepseek"), ["a", "b"], OUTPUTS)
+    second = make_memo().key(make_node(model="deepseek", prompt="Summarise"), ["a", "b"], dict(OUTPUTS))
+    assert first == second
+
+
+def test_key_changes_with_data_parents_and_format():
+    memo = make_memo()
+    base = memo.key(make_node(prompt="Summarise"), ["a", "b"], OUTPUTS)
+    assert memo.key(make_node(prompt="Translate"), ["a", "b"], OUTPUTS) != base
+    assert make_memo().key(make_node(prompt="Summarise"), ["a", "b"], {**OUTPUTS, "a": "edited"}) != base
+    assert memo.key(make_node(prompt="Summarise"), ["b", "a"], OUTPUTS) != base
+    assert memo.key(make_node("combineText", prompt="Summarise"), ["a", "b"], OUTPUTS) != base
+
+
+def test_ignored_fields_do_not_change_the_key():
+    memo = make_memo()
+    plain = memo.key(make_node(prompt="Summarise"), ["a"], OUTPUTS)
+    labelled = memo.key(make_node(prompt="Summarise", label="Step 1"), ["a"], OUTPUTS)
+    relabelled = memo.key(make_node(prompt="Summarise", label="Renamed"), ["a"], OUTPUTS)
+    assert plain == labelled == relabelled
+
+
+def test_only_memoizable_nodes_get_keys():
+    memo = make_memo()
+    assert memo.key(make_node("linkedIn", input="someone"), [], OUTPUTS) is None
+    assert memo.key(make_node("typeform"), [], OUTPUTS) is None
+    assert memo.key(make_node("pdfGenerator"), [], OUTPUTS) is None
+    assert memo.key(make_node(prompt="Summarise", useCache=False), [], OUTPUTS) is None
+
+
+def test_entry_round_trip_keeps_media_type_and_meta():
+    async def run():
+        memo = make_memo()
+        key = memo.key(make_node(prompt="Summarise"), ["a"], OUTPUTS)
+        output = NodeOutput(value={"summary": "multi\nline"}, meta={"prompt": {"tokens": 12, "trimmed": ["a"]}})
+        await memo.set(key, output)
+        return memo, await memo.get("n", key)
+
+    memo, replayed = asyncio.run(run())
+    assert replayed.media_type == JSON
+    assert replayed.value == {"summary": "multi\nline"}
+    assert replayed.meta == {"prompt": {"tokens": 12, "trimmed": ["a"]}}
+    assert memo.hits == ["n"]
+
+
+def test_text_entries_round_trip_with_empty_meta():
+    async def run():
+        memo = make_memo()
+        await memo.set("key", NodeOutput(text="line one\nline two"))
+        return await memo.get("n", "key")
+
+    replayed = asyncio.run(run())
+    assert replayed.text == "line one\nline two"
+    assert not replayed.is_json
+    assert replayed.meta == {}
+
+
+def test_errors_are_not_stored():
+    async def run():
+        memo = make_memo()
+        await memo.set("key", NodeOutput(text="Error: upstream failed"))
+        return memo, await memo.get("n", "key")
+
+    memo, replayed = asyncio.run(run())
+    assert replayed is None
+    assert memo.hits == []
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app import main
+from app.models import Workflow
+from app.utils.graph_utils import compile_workflow
+
+WORKFLOW = {
+    "nodes": [
+        {"id": "intro", "type": "combineText", "data": {"label": "Intro", "content": "Hello"}},
+        {"id": "ask", "type": "askAI", "data": {"prompt": "Summarise", "model": "deepseek"}},
+    ],
+    "edges": [{"source": "intro", "target": "ask"}],
+}
+
+
+def make_plan():
+    return compile_workflow(Workflow.model_validate(WORKFLOW))
+
+
+def test_overrides_are_merged_into_the_node_data():
+    plan = make_plan()
+    overridden = main.apply_overrides(plan, {"ask": {"prompt": "Translate", "temperature": 0.2}})
+    data = overridden.nodes["ask"].data
+    assert data.prompt == "Translate"
+    assert data.model == "deepseek"
+    assert data.temperature == 0.2
+    # The saved plan is shared and left untouched.
+    assert plan.nodes["ask"].data.prompt == "Summarise"
+    assert overridden.nodes["intro"] is plan.nodes["intro"]
+
+
+def test_overrides_are_validated_like_node_data():
+    with pytest.raises(HTTPException) as rejected:
+        main.apply_overrides(make_plan(), {"ask": {"prompt": {"not": "a string"}}})
+    assert rejected.value.status_code == 400
+    assert "ask" in rejected.value.detail and "prompt" in rejected.value.detail
+
+
+def test_saved_workflow_run_rejects_invalid_overrides():
+    client = TestClient(main.app)
+    workflow_id = client.post("/workflows", json=WORKFLOW).json()["id"]
+    response = client.post(f"/workflows/{workflow_id}/run", json={"overrides": {"ask": {"model": 42}}})
+    assert response.status_code == 400
+    assert "model" in response.json()["detail"]
+
+
+def test_batch_rejects_invalid_overrides_before_streaming():
+    response = TestClient(main.app).post(
+        "/execute-workflow/batch",
+        json={"workflow": WORKFLOW, "candidates": [{"ask": {"prompt": "ok"}}, {"ask": {"prompt": ["bad"]}}]},
+    )
+    assert response.status_code == 400
+    assert "prompt" in response.json()["detail"]
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import HTTPException
+from app.handlers import pdf_generator
+from app.models import Node
+from app.run_context import RunContext
+
+
+def make_ctx() -> RunContext:
+    node = Node(id="p", type="pdfGenerator", position={"x": 0, "y": 0}, data={"content": "Report", "persist": False})
+    return RunContext.for_node(node)
+
+
+def test_cancelled_node_holds_its_slot_until_the_render_finishes(monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_render(spec):
+        started.set()
+        release.wait(5)
+        return b"%PDF"
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(pdf_generator, "get_executor", lambda: pool)
+    monkeypatch.setattr(pdf_generator, "render_pdf", slow_render)
+    monkeypatch.setattr(pdf_generator, "PDF_MAX_QUEUE", 1)
+
+    async def run():
+        task = asyncio.create_task(pdf_generator.execute(make_ctx()))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The worker is still rendering, so the queue is still full.
+        assert pdf_generator._in_flight == 1
+        with pytest.raises(HTTPException) as rejected:
+            await pdf_generator.execute(make_ctx())
+        assert rejected.value.status_code == 429
+
+        release.set()
+        for _ in range(100):
+            if pdf_generator._in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pdf_generator._in_flight == 0
+        output = await pdf_generator.execute(make_ctx())
+        assert output.data == b"%PDF"
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        pool.shutdown()
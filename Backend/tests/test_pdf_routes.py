@@ -0,0 +1,45 @@
+import os
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.utils import pdf_store
+from app.utils.pdf_store import PDFStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = PDFStore(str(tmp_path), max_bytes=2 ** 20, max_age=60)
+    monkeypatch.setattr(pdf_store, "_store", store)
+    return store
+
+
+def keep(store: PDFStore, data: bytes, age: float = 0.0) -> str:
+    filename = store._put(data)
+    if age:
+        then = time.time() - age
+        os.utime(os.path.join(store.directory, filename), (then, then))
+    return filename
+
+
+@pytest.mark.parametrize("prefix", ["/download-pdf", "/generated_pdfs"])
+def test_kept_reports_are_served(store, prefix):
+    filename = keep(store, b"%PDF-fresh")
+    response = TestClient(main.app).get(f"{prefix}/{filename}")
+    assert response.status_code == 200
+    assert response.content == b"%PDF-fresh"
+    assert response.headers["content-type"] == "application/pdf"
+
+
+@pytest.mark.parametrize("prefix", ["/download-pdf", "/generated_pdfs"])
+def test_expired_reports_are_not_served(store, prefix):
+    filename = keep(store, b"%PDF-stale", age=120)
+    assert os.path.exists(os.path.join(store.directory, filename))
+    assert TestClient(main.app).get(f"{prefix}/{filename}").status_code == 404
+
+
+@pytest.mark.parametrize("prefix", ["/download-pdf", "/generated_pdfs"])
+def test_only_store_names_are_served(store, prefix):
+    with open(os.path.join(store.directory, "notes.pdf"), "wb") as f:
+        f.write(b"%PDF-other")
+    assert TestClient(main.app).get(f"{prefix}/notes.pdf").status_code == 404
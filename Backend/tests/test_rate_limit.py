@@ -0,0 +1,185 @@
+import asyncio
+import email.utils
+import pytest
+from app.utils import rate_limit
+from app.utils.rate_limit import ProviderLimiter, parse_retry_after
+
+
+class FakeClock:
+    """Stands in for time.monotonic/time.time; sleeping advances it instead of waiting."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await _real_sleep(0)
+
+
+_real_sleep = asyncio.sleep
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+def make_limiter(**overrides) -> ProviderLimiter:
+    options = dict(rate=2.0, burst=2, max_concurrency=4, max_retries=3, decrease_interval=1.0)
+    options.update(overrides)
+    return ProviderLimiter("test", **options)
+
+
+async def take(limiter: ProviderLimiter) -> float:
+    async with limiter.slot() as wait:
+        return wait
+
+
+def test_burst_is_free_then_calls_wait_for_refill(clock):
+    async def run():
+        limiter = make_limiter()
+        waits = [await take(limiter) for _ in range(4)]
+        return limiter, waits
+
+    limiter, waits = asyncio.run(run())
+    assert waits == [0.0, 0.0, 0.5, 0.5]
+    assert clock.now == 1001.0
+    assert limiter.stats()["acquired"] == 4
+    assert limiter.stats()["max_wait"] == 0.5
+
+
+def test_tokens_refill_up_to_burst_only(clock):
+    async def run():
+        limiter = make_limiter()
+        await take(limiter)
+        await take(limiter)
+        clock.now += 60
+        return [await take(limiter) for _ in range(3)]
+
+    assert asyncio.run(run()) == [0.0, 0.0, 0.5]
+
+
+def test_concurrency_is_capped_by_the_semaphore(clock):
+    async def run():
+        limiter = make_limiter(rate=1000.0, burst=100, max_concurrency=2)
+        active = peak = 0
+        release = asyncio.Event()
+
+        async def call():
+            nonlocal active, peak
+            async with limiter.slot():
+                active += 1
+                peak = max(peak, active)
+                await release.wait()
+                active -= 1
+
+        tasks = [asyncio.create_task(call()) for _ in range(5)]
+        for _ in range(5):
+            await _real_sleep(0)
+        waiting = limiter.stats()["waiting"]
+        release.set()
+        await asyncio.gather(*tasks)
+        return peak, waiting, limiter.stats()
+
+    peak, waiting, stats = asyncio.run(run())
+    assert peak == 2
+    assert waiting == 3
+    assert stats["acquired"] == 5
+    assert stats["waiting"] == 0
+
+
+def test_cancelled_waiter_gives_back_its_slot(clock):
+    async def run():
+        limiter = make_limiter(rate=1.0, burst=1, max_concurrency=1)
+        limiter.on_throttled(retry_after=30)
+        task = asyncio.create_task(take(limiter))
+        await _real_sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert not limiter._semaphore.locked()
+    assert limiter.waiting == 0
+
+
+def test_throttling_halves_once_per_decrease_interval(clock):
+    limiter = make_limiter(rate=4.0)
+    limiter.on_throttled()
+    limiter.on_throttled()
+    clock.now += 0.5
+    limiter.on_throttled()
+    assert limiter.rate == 2.0
+    assert limiter.stats()["throttled"] == 3
+
+    clock.now += 0.5
+    limiter.on_throttled()
+    assert limiter.rate == 1.0
+
+
+def test_rate_never_drops_below_min_rate_and_recovers_to_max(clock):
+    limiter = make_limiter(rate=0.2, min_rate=0.1, recovery_step=0.05)
+    for _ in range(5):
+        limiter.on_throttled()
+        clock.now += 1.0
+    assert limiter.rate == 0.1
+
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.rate == pytest.approx(0.2)
+
+
+def test_throttling_empties_the_bucket(clock):
+    async def run():
+        limiter = make_limiter()
+        limiter.on_throttled()
+        # Rate is now 1/s and the bucket is empty, so the next call waits a full second.
+        return await take(limiter)
+
+    assert asyncio.run(run()) == 1.0
+
+
+def test_retry_after_pauses_every_caller(clock):
+    async def run():
+        limiter = make_limiter(rate=100.0, burst=10)
+        limiter.on_throttled(retry_after=5)
+        limiter.on_throttled(retry_after=2)
+
+        async def entered():
+            async with limiter.slot():
+                return clock.now
+
+        return await asyncio.gather(entered(), entered())
+
+    # The longer pause wins and neither caller gets through before it ends.
+    assert min(asyncio.run(run())) >= 1005.0
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after("-3") == 0.0
+
+
+def test_parse_retry_after_http_date(clock):
+    header = email.utils.formatdate(clock.now + 30, usegmt=True)
+    assert parse_retry_after(header) == pytest.approx(30.0)
+    past = email.utils.formatdate(clock.now - 30, usegmt=True)
+    assert parse_retry_after(past) == 0.0
+
+
+@pytest.mark.parametrize("value", [None, "", "soon"])
+def test_parse_retry_after_rejects_garbage(value):
+    assert parse_retry_after(value) is None
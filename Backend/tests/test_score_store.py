@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from app.utils.score_store import ScoreStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "scores.sqlite3")
+
+
+def make_store(path, candidates: dict) -> ScoreStore:
+    store = ScoreStore(path)
+
+    async def fill():
+        for candidate, scores in candidates.items():
+            await store.upsert(candidate, scores, name=candidate.title())
+
+    asyncio.run(fill())
+    return store
+
+
+CANDIDATES = {
+    "ada": {"optimism": 9, "teamwork": 7},
+    "bo": {"optimism": 6, "teamwork": 10, "reliability": 8},
+    "cy": {"reliability": 10},
+}
+
+
+def ranked(result: dict) -> list:
+    return [(entry["candidate"], entry["score"], entry["coverage"]) for entry in result["results"]]
+
+
+def test_rank_orders_by_weighted_mean_of_scored_traits(path):
+    store = make_store(path, CANDIDATES)
+    result = store.rank({"Optimism": 1, "teamwork": 3})
+    assert ranked(result) == [("bo", 9.0, 1.0), ("ada", 7.5, 1.0)]
+    assert result["candidates"] == 3
+    assert result["ranked"] == 2
+    assert result["results"][0]["name"] == "Bo"
+    assert result["results"][0]["scores"] == {"optimism": 6.0, "teamwork": 10.0, "reliability": 8.0}
+
+
+def test_rank_breaks_ties_by_storage_order_and_limits_to_k(path):
+    store = make_store(path, CANDIDATES)
+    assert ranked(store.rank({"optimism": 1, "teamwork": 1})) == [("ada", 8.0, 1.0), ("bo", 8.0, 1.0)]
+    assert ranked(store.rank({"optimism": 1, "teamwork": 1}, k=1)) == [("ada", 8.0, 1.0)]
+
+
+def test_rank_reports_coverage_and_applies_min_coverage(path):
+    store = make_store(path, CANDIDATES)
+    weights = {"optimism": 2, "reliability": 2}
+    assert ranked(store.rank(weights)) == [("cy", 10.0, 0.5), ("ada", 9.0, 0.5), ("bo", 7.0, 1.0)]
+    assert ranked(store.rank(weights, min_coverage=0.75)) == [("bo", 7.0, 1.0)]
+    assert store.rank(weights, min_coverage=0.75)["ranked"] == 1
+
+
+def test_rank_reports_unknown_traits_and_skips_unscored_candidates(path):
+    store = make_store(path, CANDIDATES)
+    result = store.rank({"teamwork": 1, "curiosity": 5})
+    assert result["unknown_traits"] == ["curiosity"]
+    # Coverage is measured against the weight of known traits only; cy has no teamwork score.
+    assert ranked(result) == [("bo", 10.0, 1.0), ("ada", 7.0, 1.0)]
+
+
+def test_rank_with_no_known_traits_is_empty(path):
+    store = make_store(path, CANDIDATES)
+    result = store.rank({"curiosity": 1})
+    assert result["results"] == [] and result["ranked"] == 0
+
+
+def test_reloads_from_the_file(path):
+    make_store(path, CANDIDATES).close()
+    reopened = ScoreStore(path)
+    assert reopened.get("bo") == {"candidate": "bo", "name": "Bo", "scores": {"optimism": 6.0, "teamwork": 10.0, "reliability": 8.0}}
+    assert reopened.stats() == {"candidates": 3, "traits": {"optimism": 2, "teamwork": 2, "reliability": 2}}
+
+
+def test_refresh_picks_up_other_processes_writes_and_deletes(path):
+    writer = make_store(path, CANDIDATES)
+    reader = ScoreStore(path)
+
+    async def run():
+        await writer.upsert("dee", {"optimism": 10}, name="Dee")
+        await writer.upsert("ada", {"optimism": 1})
+        await writer.delete("cy")
+        stale = reader.stats()["candidates"], reader.get("dee")
+        await reader.refresh()
+        return stale
+
+    assert asyncio.run(run()) == (3, None)
+    assert reader.get("dee")["scores"] == {"optimism": 10.0}
+    assert reader.get("ada") == {"candidate": "ada", "name": "Ada", "scores": {"optimism": 1.0}}
+    assert reader.get("cy") is None
+    assert reader.stats()["candidates"] == 3
+    assert [entry["candidate"] for entry in reader.rank({"optimism": 1})["results"]] == ["dee", "bo", "ada"]
@@ -0,0 +1,42 @@
+import pytest
+from app.utils.scores import DEFAULT_WEIGHTS, extract_scores, weighted_score
+
+TRAITS = list(DEFAULT_WEIGHTS)
+
+
+def test_extracts_markdown_scores():
+    text = "**Resourcefulness:** 8/10\n**Optimism**: 7\n- Teamwork - 9 / 10, works well with others"
+    assert extract_scores(text, TRAITS) == {"resourcefulness": 8.0, "optimism": 7.0, "teamwork": 9.0}
+
+
+def test_rescales_other_scales_to_ten():
+    assert extract_scores("Reliability: 4 out of 5", TRAITS) == {"reliability": 8.0}
+
+
+def test_ignores_weights_next_to_a_trait():
+    assert extract_scores("Excitement (weight: 4): 6/10", TRAITS) == {"excitement": 6.0}
+    assert extract_scores("Excitement (weight: 4) - 6", TRAITS) == {"excitement": 6.0}
+
+
+def test_reads_json_objects_case_insensitively():
+    text = 'Scores: {"Optimism": 6, "teamwork": 7.5, "notes": "solid"}'
+    assert extract_scores(text, TRAITS) == {"optimism": 6.0, "teamwork": 7.5}
+
+
+def test_skips_out_of_range_and_unscored_traits():
+    text = "Optimism: 42\nOptimism: 5\nTeamwork was not assessed."
+    assert extract_scores(text, TRAITS) == {"optimism": 5.0}
+
+
+def test_missing_traits_are_left_out():
+    assert extract_scores("No scores here.", TRAITS) == {}
+
+
+def test_weighted_score_only_counts_scored_traits():
+    weights = {"optimism": 4, "teamwork": 1, "reliability": 5}
+    assert weighted_score({"optimism": 10, "teamwork": 5}, weights) == pytest.approx(9.0)
+
+
+def test_weighted_score_is_none_without_weighted_traits():
+    assert weighted_score({"optimism": 10}, {"teamwork": 3}) is None
+    assert weighted_score({"optimism": 10}, {"optimism": 0}) is None
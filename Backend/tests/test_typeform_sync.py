@@ -0,0 +1,53 @@
+import asyncio
+import httpx
+from app.handlers import typeform
+from app.utils.typeform_store import TypeformStore
+
+
+def make_response(index: int) -> dict:
+    return {"token": f"r{index:03d}", "submitted_at": f"2024-01-01T00:{index // 60:02d}:{index % 60:02d}Z", "answers": []}
+
+
+class FakeTypeform:
+    """Serves /responses like Typeform: newest first, filtered by since/before, paged."""
+
+    def __init__(self, responses):
+        self.responses = sorted(responses, key=lambda item: item["submitted_at"], reverse=True)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        self.requests.append(params)
+        items = self.responses
+        if "since" in params:
+            items = [item for item in items if item["submitted_at"] > params["since"]]
+        if "before" in params:
+            tokens = [item["token"] for item in items]
+            items = items[tokens.index(params["before"]) + 1:]
+        return httpx.Response(200, json={"items": items[:int(params["page_size"])]})
+
+
+def test_sync_pages_through_every_new_response(tmp_path, monkeypatch):
+    monkeypatch.setattr(typeform, "SYNC_PAGE_SIZE", 25)
+    store = TypeformStore(str(tmp_path / "typeform.sqlite3"))
+    fake = FakeTypeform([make_response(index) for index in range(61)])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(fake)) as client:
+            # The first sync only stores the latest response.
+            await typeform.sync_responses(client, store, "acct", "form", {})
+            fake.responses = [make_response(index) for index in range(61, 121)] + fake.responses
+            fake.responses.sort(key=lambda item: item["submitted_at"], reverse=True)
+            fake.requests.clear()
+            added = await typeform.sync_responses(client, store, "acct", "form", {})
+            stored = await store.latest_responses("acct", "form", limit=None)
+            return added, stored
+
+    added, stored = asyncio.run(run())
+    store.close()
+
+    assert added == 60
+    assert {item["token"] for item in stored} == {f"r{index:03d}" for index in range(60, 121)}
+    assert len(fake.requests) == 3
+    assert "before" not in fake.requests[0]
+    assert [request.get("before") for request in fake.requests[1:]] == ["r096", "r071"]